@@ -0,0 +1,186 @@
+import multiprocessing
+import queue
+import time
+
+from BitBoard import BitBoard
+from Rules import pawn_moves
+
+# Extra time a worker gets after being told to stop before it is treated as hung and restarted.
+KILL_GRACE = 2.0
+
+
+class AIWorker:
+    """Runs an engine in its own process so the GUI never blocks on a search.
+
+    The engine stays alive between moves (its tables are reused). Every request gets a
+    job id; only the result of the latest job that was not cancelled is ever returned,
+    so a move computed for a position that was undone is dropped. Stopping is
+    cooperative: the engine polls a shared counter and returns its best move so far.
+    """
+    def __init__(self, engine_cls, config, book_path=None):
+        self.spec = (engine_cls, config, book_path)
+        self.ctx = multiprocessing.get_context("spawn")
+        self.job = None             # id of the job whose result we still want
+        self.next_id = 1
+        self.started = 0.0
+        self.timeout = None
+        self.stop_sent = False
+        self.position = None
+        self.progress = None        # latest stats summary for the current job, if the engine reports any
+        self.process = None
+        self._start()
+
+    def _start(self):
+        self.requests = self.ctx.Queue()
+        self.results = self.ctx.Queue()
+        # Jobs with an id at or below this value must stop now.
+        self.stop_upto = self.ctx.Value("q", 0, lock=False)
+        self.process = self.ctx.Process(target=_worker_main, daemon=True,
+                                        args=(self.spec, self.requests, self.results, self.stop_upto))
+        self.process.start()
+
+    def submit(self, state, idx, timeout=None):
+        """Starts searching state for player idx. Any job still running is cancelled."""
+        self.cancel()
+        job = self.next_id
+        self.next_id += 1
+        self.job = job
+        self.position = (state.copy(), idx)
+        self.started = time.perf_counter()
+        self.timeout = timeout
+        self.stop_sent = False
+        self.progress = None
+        self.requests.put(("search", job, state.pack(), idx))
+        return job
+
+    def ponder(self, state, idx):
+        """Lets the engine think on the opponent's time; state is the position after idx's move.
+
+        Nothing is returned. The next submit() or cancel() stops it.
+        """
+        self.cancel()
+        job = self.next_id
+        self.next_id += 1
+        self.requests.put(("ponder", job, state.pack(), idx))
+
+    def busy(self):
+        return self.job is not None
+
+    def poll(self):
+        """Non-blocking. Returns (job, move, info) once the current job is done, else None.
+
+        Progress reports from the engine update self.progress in the meantime. Past its
+        timeout the job is asked to stop; if the worker still has not answered after
+        KILL_GRACE seconds it is restarted and a plain shortest-path step is returned.
+        """
+        while True:
+            try:
+                kind, job, payload = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if job != self.job:
+                continue
+            if kind == "progress":
+                self.progress = payload
+                continue
+            move, info = payload
+            self.job = None
+            if "stats" in info:
+                self.progress = info["stats"]
+            return job, move, info
+
+        if self.job is None or self.timeout is None:
+            return None
+        elapsed = time.perf_counter() - self.started
+        if elapsed >= self.timeout and not self.stop_sent:
+            self.stop_upto.value = self.job
+            self.stop_sent = True
+        if elapsed >= self.timeout + KILL_GRACE:
+            job = self.job
+            self.job = None
+            self._restart()
+            state, idx = self.position
+            return job, _fallback_move(state, idx), {"fallback": True}
+        return None
+
+    def cancel(self):
+        """Stops the current job, and any pondering, and forgets it; its result will be discarded."""
+        self.stop_upto.value = self.next_id - 1
+        self.job = None
+
+    def clear(self):
+        """Drops the engine's tables (after the game is rewound)."""
+        self.cancel()
+        self.requests.put(("clear",))
+
+    def _restart(self):
+        self.process.terminate()
+        self.process.join(1.0)
+        self._start()
+
+    def close(self):
+        self.cancel()
+        if self.process is None:
+            return
+        try:
+            self.requests.put(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(0.5)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(0.5)
+        self.process = None
+
+
+def _fallback_move(state, idx):
+    options = pawn_moves(state, idx)
+    if not options:
+        return None
+    field = state.fields[idx]
+    return min(options, key=lambda m: field[m[1]])
+
+
+def _worker_main(spec, requests, results, stop_upto):
+    engine_cls, config, book_path = spec
+    engine = engine_cls(**config)
+    if book_path:
+        from OpeningBook import OpeningBook
+        engine.book = OpeningBook(book_path)
+
+    current = [0]
+    engine.should_stop = lambda: current[0] <= stop_upto.value
+    if hasattr(engine, "stats"):
+        def report(e):
+            if not e._pondering:
+                results.put(("progress", current[0], e.stats.summary()))
+        engine.on_iteration = report
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        if request[0] == "clear":
+            engine.clear()
+            continue
+        kind, job, packed, idx = request
+        current[0] = job
+        if job <= stop_upto.value:
+            continue
+        state = BitBoard.unpack(packed)
+        if kind == "ponder":
+            if hasattr(engine, "ponder"):
+                engine.ponder(state, idx)
+            continue
+        move = engine.search(state, idx)
+        info = {
+            "value": engine.best_value,
+            "depth": getattr(engine, "completed_depth", None),
+            "nodes": engine.nodes,
+            "pv": engine.pv,
+            "hash": state.hash,
+        }
+        if hasattr(engine, "stats"):
+            info["stats"] = engine.stats.summary()
+        results.put(("done", job, (move, info)))
+    if hasattr(engine, "close"):
+        engine.close()
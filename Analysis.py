@@ -0,0 +1,167 @@
+"""Position analysis: one position at a time, or whole batches over a process pool.
+
+    python Analysis.py games.qgr --depth 4 --time 1 --workers 8 --output analysis.jsonl
+
+analyse() scores a single position without touching anything outside it. Analyzer keeps a
+pool of worker processes, each with its own long-lived engine, and streams results back in
+input order. The command line runs every position of a game archive through it and writes
+one JSON line per position, with the move that was actually played next to the engine's.
+"""
+import argparse
+import collections
+import json
+import math
+import multiprocessing
+import sys
+import time
+
+from BitBoard import BitBoard
+from GameRecord import GameRecordReader, from_fen, move_to_text, to_fen, to_text
+from SearchEngine import SearchEngine
+
+
+def analyse(state, idx, engine=None, **config):
+    """Best move, score and PV for player idx in state.
+
+    The engine searches a copy, so state is left as it was. Pass an engine to reuse its
+    tables between calls; otherwise a fresh SearchEngine(**config) is built. Returns a dict
+    with the position string, move and PV in game-record notation, the score from idx's
+    point of view (+-inf for a forced result), completed depth, nodes and seconds.
+    """
+    if engine is None:
+        engine = SearchEngine(**config)
+    t0 = time.perf_counter()
+    move = engine.search(state.copy(), idx)
+    size = state.size
+    return {
+        "position": to_fen(state, idx),
+        "move": move_to_text(move, size) if move is not None else None,
+        "score": engine.best_value,
+        "pv": to_text(engine.pv, size),
+        "depth": engine.completed_depth,
+        "nodes": engine.nodes,
+        "seconds": time.perf_counter() - t0,
+    }
+
+
+def _as_task(position):
+    """A position string or a (BitBoard, idx) pair, as a picklable (packed, idx) task."""
+    if isinstance(position, str):
+        position = from_fen(position)
+    state, idx = position
+    return state.pack(), idx
+
+
+class Analyzer:
+    """Batch analysis over warm worker engines.
+
+    The pool starts on first use and stays up until close(), so every batch after the first
+    reuses the workers' engines and their tables. Each worker takes one position at a time,
+    which keeps the load even when some positions take much longer than others.
+    """
+    def __init__(self, workers=None, **config):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.config = config
+        self._pool = None
+        self._engine = None
+
+    def analyse_many(self, positions):
+        """Yields one analyse() result per position, in input order, as soon as each is ready.
+
+        positions is any iterable of position strings or (BitBoard, idx) pairs.
+        """
+        tasks = map(_as_task, positions)
+        if self.workers <= 1:
+            if self._engine is None:
+                self._engine = SearchEngine(**self.config)
+            for packed, idx in tasks:
+                yield analyse(BitBoard.unpack(packed), idx, self._engine)
+            return
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.workers, initializer=_init_worker, initargs=(self.config,))
+        yield from self._pool.imap(_analyse_task, tasks)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        if self._engine is not None:
+            self._engine.close()
+            self._engine = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def archive_positions(path):
+    """Every position in a game archive before each move, as (game, ply, position string, played move)."""
+    with GameRecordReader(path) as reader:
+        for game, (moves, size, _) in enumerate(reader):
+            state = BitBoard(size)
+            for ply, move in enumerate(moves):
+                idx = ply % 2
+                yield game, ply, to_fen(state, idx), move_to_text(move, size)
+                state.apply(idx, move)
+
+
+# --- worker process side ---------------------------------------------
+
+_worker_engine = None
+
+
+def _init_worker(config):
+    global _worker_engine
+    _worker_engine = SearchEngine(**config)
+
+
+def _analyse_task(task):
+    packed, idx = task
+    return analyse(BitBoard.unpack(packed), idx, _worker_engine)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse every position of a game archive.")
+    parser.add_argument("archive", help="binary game archive (.qgr)")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--time", type=float, default=None, help="seconds per position")
+    parser.add_argument("--nodes", type=int, default=None, help="node budget per position")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--output", help="JSON lines file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    # Positions stream from the archive into the pool; their labels wait here for the results.
+    pending = collections.deque()
+
+    def positions():
+        for game, ply, fen, played in archive_positions(args.archive):
+            pending.append((game, ply, played))
+            yield fen
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    start = time.perf_counter()
+    count = 0
+    try:
+        with Analyzer(args.workers, search_depth=args.depth, time_budget=args.time,
+                      node_budget=args.nodes) as analyzer:
+            for result in analyzer.analyse_many(positions()):
+                game, ply, played = pending.popleft()
+                count += 1
+                if math.isinf(result["score"]):
+                    result["score"] = "win" if result["score"] > 0 else "loss"
+                result.update(game=game, ply=ply, played=played)
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    sys.stderr.write(f"{count} positions in {elapsed:.1f}s "
+                     f"({count / elapsed if elapsed else 0:.1f}/s)\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Per-move latency of the alpha-beta engine across board sizes.
+
+    python Benchmark.py                              # 9x9, 11x11 and 13x13 at depth 2
+    python Benchmark.py --depth 3 --max-ratio 4      # exit 1 if a size is over 4x the 9x9 time
+    python Benchmark.py --selective                  # selective walls on every size, 9x9 included
+
+Each size gets the same number of reproducible positions: random games a few moves in,
+with some walls placed. Every position is searched to a fixed depth with no time or node
+limit and no opening book, so the time measured is the search itself. By default each size
+uses the engine's own wall generation, which is full-width on 9x9 and selective above it;
+--selective makes every size selective for a like-for-like comparison. Move generation
+and legality are timed separately as full legal move lists per second.
+"""
+import argparse
+import random
+import sys
+import time
+
+from BitBoard import BitBoard
+from Config import TYPE_PAWN
+from Rules import legal_moves
+from SearchEngine import SearchEngine
+
+
+def sample_positions(size, count=6, seed=1):
+    """count positions after 6, 8, 10... random plies, about 40% of them walls."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        state = BitBoard(size)
+        idx = 0
+        for _ in range(6 + 2 * len(positions)):
+            moves = legal_moves(state, idx)
+            pawns = [m for m in moves if m[0] == TYPE_PAWN]
+            walls = [m for m in moves if m[0] != TYPE_PAWN]
+            state.apply(idx, rng.choice(walls if walls and rng.random() < 0.4 else pawns))
+            if state.at_goal(idx):
+                break
+            idx = 1 - idx
+        else:
+            positions.append((state, idx))
+    return positions
+
+
+def bench_size(size, depth, count, seed, selective=None):
+    positions = sample_positions(size, count, seed)
+    elapsed = 0.0
+    nodes = 0
+    for state, idx in positions:
+        engine = SearchEngine(search_depth=depth - 1, time_budget=None, selective=selective)
+        t0 = time.perf_counter()
+        engine.search(state, idx)
+        elapsed += time.perf_counter() - t0
+        nodes += engine.nodes
+
+    calls = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < 0.5:
+        for state, idx in positions:
+            legal_moves(state, idx)
+        calls += len(positions)
+    gen = calls / (time.perf_counter() - t0)
+
+    return {
+        "size": size,
+        "ms_per_move": 1000 * elapsed / len(positions),
+        "nodes_per_move": nodes // len(positions),
+        "nodes_per_sec": nodes / elapsed if elapsed else 0.0,
+        "movegen_per_sec": gen,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search latency per board size.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[9, 11, 13])
+    parser.add_argument("--depth", type=int, default=2, help="plies searched, counting the root move")
+    parser.add_argument("--positions", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--selective", action="store_true", help="selective wall generation on every size")
+    parser.add_argument("--max-ratio", type=float, default=None,
+                        help="fail if any size takes more than this multiple of the first size's time")
+    args = parser.parse_args(argv)
+
+    base = None
+    failed = False
+    for size in args.sizes:
+        r = bench_size(size, args.depth, args.positions, args.seed, True if args.selective else None)
+        if base is None:
+            base = r["ms_per_move"]
+        ratio = r["ms_per_move"] / base if base else 0.0
+        print(f"{size:2d}x{size:<2d}  {r['ms_per_move']:8.1f} ms/move  x{ratio:4.2f}  "
+              f"{r['nodes_per_move']:8,d} nodes  {r['nodes_per_sec']:8,.0f} nodes/sec  "
+              f"{r['movegen_per_sec']:8,.0f} move lists/sec")
+        if args.max_ratio is not None and ratio > args.max_ratio:
+            failed = True
+    if failed:
+        print(f"latency above {args.max_ratio}x of {args.sizes[0]}x{args.sizes[0]}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
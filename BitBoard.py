@@ -0,0 +1,518 @@
+import heapq
+import random
+from Config import HORIZONTAL, VERTICAL, TYPE_PAWN
+
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT)
+
+UNREACHABLE = 1 << 20
+
+_TABLES = {}
+_floods = [0]
+_wall_candidates = [0]
+
+
+def flood_count():
+    """Breadth-first searches run so far in this process (path checks and distance-field builds or repairs)."""
+    return _floods[0]
+
+
+def wall_candidate_count():
+    """Walls legal_walls has looked at so far in this process, accepted or not."""
+    return _wall_candidates[0]
+
+
+class _Tables:
+    """Per-size bit masks shared by every BitBoard of that size."""
+    def __init__(self, size):
+        n = size
+        w = size - 1
+        self.size = n
+        self.slot_dim = w
+        self.full = (1 << (n * n)) - 1
+        self.all_slots = (1 << (w * w)) - 1
+        self.delta = (-n, n, -1, 1)
+
+        self.row_mask = [((1 << n) - 1) << (r * n) for r in range(n)]
+        col0 = sum(1 << (r * n) for r in range(n))
+        self.col_mask = [col0 << c for c in range(n)]
+
+        slot_col0 = sum(1 << (y * w) for y in range(w))
+        self.slot_first_col = slot_col0
+        self.slot_last_col = slot_col0 << (w - 1)
+
+        # Cells whose edge in each direction leads off the board.
+        self.edge = (self.row_mask[0], self.row_mask[n - 1], self.col_mask[0], self.col_mask[n - 1])
+
+        # For each wall slot, the (direction, cell mask) pairs it closes.
+        self.h_edges = []
+        self.v_edges = []
+        for y in range(w):
+            for x in range(w):
+                a, b = y * n + x, y * n + x + 1
+                c, d = (y + 1) * n + x, (y + 1) * n + x + 1
+                self.h_edges.append(((DOWN, (1 << a) | (1 << b)), (UP, (1 << c) | (1 << d))))
+                self.v_edges.append(((RIGHT, (1 << a) | (1 << c)), (LEFT, (1 << b) | (1 << d))))
+
+        # Inverse of the above: for each direction and cell, the slots whose wall closes that edge.
+        self.cut_h = [[0] * (n * n) for _ in DIRECTIONS]
+        self.cut_v = [[0] * (n * n) for _ in DIRECTIONS]
+        for slot in range(w * w):
+            for cut, edges in ((self.cut_h, self.h_edges[slot]), (self.cut_v, self.v_edges[slot])):
+                for d, mask in edges:
+                    for cell in iter_bits(mask):
+                        cut[d][cell] |= 1 << slot
+        self.step_dir = {-n: UP, n: DOWN, -1: LEFT, 1: RIGHT}
+
+        # Wall slots touching a cell or any of its neighbours, for selective wall generation.
+        self.near_slots = []
+        for cell in range(n * n):
+            r, c = divmod(cell, n)
+            mask = 0
+            for y in range(max(0, r - 2), min(w, r + 2)):
+                for x in range(max(0, c - 2), min(w, c + 2)):
+                    mask |= 1 << (y * w + x)
+            self.near_slots.append(mask)
+
+        # On-board (direction, neighbour) pairs per cell, for the distance-field repairs.
+        self.adj = []
+        for cell in range(n * n):
+            self.adj.append(tuple((d, cell + self.delta[d]) for d in DIRECTIONS
+                                  if not (self.edge[d] >> cell) & 1))
+
+        # Zobrist keys. Seeded so hashes are stable across runs and processes.
+        rng = random.Random(0x5157 + size)
+        key = lambda: rng.getrandbits(64)
+        self.z_pawn = [[key() for _ in range(n * n)] for _ in range(2)]
+        self.z_hwall = [key() for _ in range(w * w)]
+        self.z_vwall = [key() for _ in range(w * w)]
+        self.z_walls_left = [[key() for _ in range(32)] for _ in range(2)]
+        self.z_side = key()
+        self.z_root = key()     # search tables only: scores seen from player 2's side
+
+
+def tables(size):
+    t = _TABLES.get(size)
+    if t is None:
+        t = _TABLES[size] = _Tables(size)
+    return t
+
+
+def iter_bits(mask):
+    """Yields the index of every set bit, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class BitBoard:
+    """Compact position: pawn cells, wall masks and passable-edge masks stored as Python ints.
+
+    Cells are numbered row * size + col on the pawn lattice, wall slots y * (size - 1) + x
+    on the lattice of wall centres. Index 0 is player 1, index 1 is player 2.
+    """
+    def __init__(self, size=9, walls=10):
+        self.t = tables(size)
+        self.size = size
+        self.pawns = [(size - 1) * size + size // 2, size // 2]
+        self.walls_left = [walls, walls]
+        self.goal_rows = [0, size - 1]
+        self.hwalls = 0
+        self.vwalls = 0
+        self.open = [self.t.full & ~e for e in self.t.edge]
+        self.hash = self._full_hash()
+        self.fields = [self._build_field(0), self._build_field(1)]
+
+    def _full_hash(self):
+        t = self.t
+        h = t.z_pawn[0][self.pawns[0]] ^ t.z_pawn[1][self.pawns[1]]
+        h ^= t.z_walls_left[0][self.walls_left[0]] ^ t.z_walls_left[1][self.walls_left[1]]
+        for slot in iter_bits(self.hwalls): h ^= t.z_hwall[slot]
+        for slot in iter_bits(self.vwalls): h ^= t.z_vwall[slot]
+        return h
+
+    def copy(self):
+        b = BitBoard.__new__(BitBoard)
+        b.t = self.t
+        b.size = self.size
+        b.pawns = self.pawns[:]
+        b.walls_left = self.walls_left[:]
+        b.goal_rows = self.goal_rows
+        b.hwalls = self.hwalls
+        b.vwalls = self.vwalls
+        b.open = self.open[:]
+        b.hash = self.hash
+        b.fields = [self.fields[0][:], self.fields[1][:]]
+        return b
+
+    def pack(self):
+        """Small picklable tuple describing the position; see unpack()."""
+        return (self.size, tuple(self.pawns), tuple(self.walls_left), self.hwalls, self.vwalls)
+
+    @classmethod
+    def unpack(cls, packed):
+        size, pawns, walls_left, hwalls, vwalls = packed
+        b = cls(size)
+        for slot in iter_bits(hwalls):
+            b._set_wall_bits(slot, HORIZONTAL, True)
+        for slot in iter_bits(vwalls):
+            b._set_wall_bits(slot, VERTICAL, True)
+        b.pawns = list(pawns)
+        b.walls_left = list(walls_left)
+        b.hash = b._full_hash()
+        b.fields = [b._build_field(0), b._build_field(1)]
+        return b
+
+    # --- coordinates -------------------------------------------------
+
+    def cell(self, row, col):
+        return row * self.size + col
+
+    def row(self, cell):
+        return cell // self.size
+
+    def from_grid(self, r, c):
+        """Converts a pawn square of the 17x17 display grid to a cell index."""
+        return (r // 2) * self.size + c // 2
+
+    def to_grid(self, cell):
+        return [2 * (cell // self.size), 2 * (cell % self.size)]
+
+    def wall_from_grid(self, coords):
+        """Maps the three display-grid cells of a wall to (slot, orientation), or None if malformed."""
+        (r1, c1), (mr, mc), (r2, c2) = coords
+        if mr % 2 == 0 or mc % 2 == 0:
+            return None
+        if r1 == r2 == mr and abs(c1 - c2) == 2:
+            orient = HORIZONTAL
+        elif c1 == c2 == mc and abs(r1 - r2) == 2:
+            orient = VERTICAL
+        else:
+            return None
+        return (mr // 2) * self.t.slot_dim + mc // 2, orient
+
+    def wall_to_grid(self, slot, orient):
+        y, x = divmod(slot, self.t.slot_dim)
+        mr, mc = 2 * y + 1, 2 * x + 1
+        if orient == HORIZONTAL:
+            return [(mr, mc - 1), (mr, mc), (mr, mc + 1)]
+        return [(mr - 1, mc), (mr, mc), (mr + 1, mc)]
+
+    def grid_value(self, r, c):
+        """Value the old 17x17 grid held at (r, c): pawn id, 1 for a wall gap, orientation for a wall centre."""
+        n = self.size
+        if r % 2 == 0 and c % 2 == 0:
+            cell = (r // 2) * n + c // 2
+            if self.pawns[0] == cell: return 1
+            if self.pawns[1] == cell: return 2
+            return 0
+        if r % 2 == 1 and c % 2 == 1:
+            bit = 1 << ((r // 2) * self.t.slot_dim + c // 2)
+            if self.hwalls & bit: return HORIZONTAL
+            if self.vwalls & bit: return VERTICAL
+            return 0
+        if r % 2 == 1:
+            return 0 if (self.open[DOWN] >> ((r // 2) * n + c // 2)) & 1 else 1
+        return 0 if (self.open[RIGHT] >> ((r // 2) * n + c // 2)) & 1 else 1
+
+    # --- pawns -------------------------------------------------------
+
+    def occupancy(self):
+        return (1 << self.pawns[0]) | (1 << self.pawns[1])
+
+    def step(self, cell, direction):
+        """Neighbour of cell in direction, or -1 if a wall or the board edge is in the way."""
+        if (self.open[direction] >> cell) & 1:
+            return cell + self.t.delta[direction]
+        return -1
+
+    def move_pawn(self, idx, cell):
+        z = self.t.z_pawn[idx]
+        self.hash ^= z[self.pawns[idx]] ^ z[cell]
+        self.pawns[idx] = cell
+
+    def set_walls_left(self, idx, count):
+        z = self.t.z_walls_left[idx]
+        self.hash ^= z[self.walls_left[idx]] ^ z[count]
+        self.walls_left[idx] = count
+
+    def at_goal(self, idx):
+        return self.pawns[idx] // self.size == self.goal_rows[idx]
+
+    # --- walls -------------------------------------------------------
+
+    def free_wall_slots(self, orient):
+        """Mask of slots where a wall of the given orientation would not overlap or cross another."""
+        t = self.t
+        h, v = self.hwalls, self.vwalls
+        if orient == HORIZONTAL:
+            taken = h | v | ((h << 1) & ~t.slot_first_col) | ((h >> 1) & ~t.slot_last_col)
+        else:
+            w = t.slot_dim
+            taken = v | h | (v << w) | (v >> w)
+        return t.all_slots & ~taken
+
+    def wall_fits(self, slot, orient):
+        return (self.free_wall_slots(orient) >> slot) & 1 == 1
+
+    def _set_wall_bits(self, slot, orient, on):
+        """Sets or clears a wall's slot bit, edge masks and hash key, leaving distance fields alone."""
+        t = self.t
+        if orient == HORIZONTAL:
+            self.hwalls ^= 1 << slot
+            edges = t.h_edges[slot]
+            self.hash ^= t.z_hwall[slot]
+        else:
+            self.vwalls ^= 1 << slot
+            edges = t.v_edges[slot]
+            self.hash ^= t.z_vwall[slot]
+        o = self.open
+        for d, mask in edges:
+            if on:
+                o[d] &= ~mask
+            else:
+                o[d] |= mask
+        return edges
+
+    def place_wall(self, slot, orient, idx=None):
+        """Places a wall and repairs both distance fields. Returns the field changes for undo."""
+        edges = self._set_wall_bits(slot, orient, True)
+        if idx is not None:
+            self.set_walls_left(idx, self.walls_left[idx] - 1)
+        closed = self._wall_edge_pairs(edges)
+        return [self._raise_field(f, closed) for f in self.fields]
+
+    def remove_wall(self, slot, orient, idx=None, changes=None):
+        """Removes a wall. With the change log from place_wall the fields are restored directly."""
+        edges = self._set_wall_bits(slot, orient, False)
+        if idx is not None:
+            self.set_walls_left(idx, self.walls_left[idx] + 1)
+        if changes is not None:
+            for field, log in zip(self.fields, changes):
+                for cell, old in log:
+                    field[cell] = old
+        else:
+            opened = self._wall_edge_pairs(edges)
+            for f in self.fields:
+                self._lower_field(f, opened)
+
+    # --- make / unmake -----------------------------------------------
+
+    def apply(self, idx, move):
+        """Plays move for player idx in place. Returns the token undo() needs to take it back."""
+        if move[0] == TYPE_PAWN:
+            prev = self.pawns[idx]
+            self.move_pawn(idx, move[1])
+            return prev
+        return self.place_wall(move[1], move[2], idx)
+
+    def undo(self, idx, move, token):
+        if move[0] == TYPE_PAWN:
+            self.move_pawn(idx, token)
+        else:
+            self.remove_wall(move[1], move[2], idx, token)
+
+    # --- paths -------------------------------------------------------
+
+    def spread(self, mask):
+        """All cells one unblocked step away from any cell in mask."""
+        o = self.open
+        n = self.size
+        return ((mask & o[UP]) >> n) | ((mask & o[DOWN]) << n) | ((mask & o[LEFT]) >> 1) | ((mask & o[RIGHT]) << 1)
+
+    def distance(self, idx):
+        """Shortest path length in steps from a pawn to its goal row (walls only), or None."""
+        _floods[0] += 1
+        goal = self.t.row_mask[self.goal_rows[idx]]
+        seen = frontier = 1 << self.pawns[idx]
+        d = 0
+        while frontier:
+            if frontier & goal:
+                return d
+            frontier = self.spread(frontier) & ~seen
+            seen |= frontier
+            d += 1
+        return None
+
+    def has_path(self, idx):
+        return self.distance(idx) is not None
+
+    def goal_distance(self, idx):
+        """O(1) shortest path length for a pawn, read from its distance field."""
+        return self.fields[idx][self.pawns[idx]]
+
+    def shortest_path(self, idx):
+        """One shortest route (list of cells, pawn first) to the goal row, or None.
+
+        Walks downhill on the player's distance field, so it costs one step per cell.
+        """
+        field = self.fields[idx]
+        cell = self.pawns[idx]
+        if field[cell] >= UNREACHABLE:
+            return None
+        o = self.open
+        delta = self.t.delta
+        path = [cell]
+        while field[cell]:
+            want = field[cell] - 1
+            for d in DIRECTIONS:
+                if (o[d] >> cell) & 1 and field[cell + delta[d]] == want:
+                    cell += delta[d]
+                    break
+            path.append(cell)
+        return path
+
+    def path_cuts(self, idx):
+        """(horizontal, vertical) slot masks of walls that would cut the pawn's current shortest path.
+
+        A wall outside these masks leaves that path intact, so it cannot disconnect the pawn.
+        """
+        t = self.t
+        path = self.shortest_path(idx)
+        if path is None:
+            return t.all_slots, t.all_slots
+        h = v = 0
+        for a, b in zip(path, path[1:]):
+            d = t.step_dir[b - a]
+            h |= t.cut_h[d][a]
+            v |= t.cut_v[d][a]
+        return h, v
+
+    def legal_walls(self, masks=None):
+        """All (slot, orientation) pairs where a wall fits and keeps both goals reachable.
+
+        Each pawn's shortest path is found once; only walls that touch one of those paths
+        get a flood-fill check, everything else is accepted outright. masks, if given, is
+        a (horizontal, vertical) pair of slot masks restricting which walls are considered.
+        """
+        h0, v0 = self.path_cuts(0)
+        h1, v1 = self.path_cuts(1)
+        if masks is None:
+            masks = (self.t.all_slots, self.t.all_slots)
+        walls = []
+        seen = 0
+        for orient, cut, allowed in ((HORIZONTAL, h0 | h1, masks[0]), (VERTICAL, v0 | v1, masks[1])):
+            for slot in iter_bits(self.free_wall_slots(orient) & allowed):
+                seen += 1
+                if (cut >> slot) & 1 and not self.wall_keeps_paths(slot, orient):
+                    continue
+                walls.append((slot, orient))
+        _wall_candidates[0] += seen
+        return walls
+
+    def wall_keeps_paths(self, slot, orient):
+        """True if placing the wall would leave both pawns a route to their goal rows."""
+        self._set_wall_bits(slot, orient, True)
+        ok = self.has_path(0) and self.has_path(1)
+        self._set_wall_bits(slot, orient, False)
+        return ok
+
+    # --- distance fields ---------------------------------------------
+    #
+    # fields[idx][cell] is the wall-only BFS distance from cell to player idx's goal row.
+    # Placing a wall can only raise distances and removing one can only lower them, so
+    # both are repaired locally from the edges the wall touches. The repairs walk the
+    # per-size adjacency table, so they work on any board size.
+
+    def _build_field(self, idx):
+        _floods[0] += 1
+        field = [UNREACHABLE] * (self.size * self.size)
+        seen = frontier = self.t.row_mask[self.goal_rows[idx]]
+        d = 0
+        while frontier:
+            m = frontier
+            while m:
+                low = m & -m
+                field[low.bit_length() - 1] = d
+                m ^= low
+            frontier = self.spread(frontier) & ~seen
+            seen |= frontier
+            d += 1
+        return field
+
+    def _wall_edge_pairs(self, edges):
+        """The two cell pairs a wall separates, as (cell, neighbour) tuples."""
+        (d, mask), _ = edges
+        delta = self.t.delta[d]
+        return [(cell, cell + delta) for cell in iter_bits(mask)]
+
+    def _raise_field(self, field, closed):
+        """Repairs field after the given edges were closed. Returns [(cell, old_value)]."""
+        _floods[0] += 1
+        suspects = []
+        for a, b in closed:
+            if field[a] == field[b] + 1:
+                suspects.append((field[a], a))
+            elif field[b] == field[a] + 1:
+                suspects.append((field[b], b))
+        if not suspects:
+            return []
+
+        o = self.open
+        adj = self.t.adj
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        # Cells in increasing distance order lose their value if no unaffected neighbour
+        # one step closer to the goal remains.
+        heapq.heapify(suspects)
+        affected = set()
+        while suspects:
+            du, u = heappop(suspects)
+            if du == 0 or u in affected:
+                continue
+            supported = False
+            for d, v in adj[u]:
+                if (o[d] >> u) & 1 and field[v] == du - 1 and v not in affected:
+                    supported = True
+                    break
+            if supported:
+                continue
+            affected.add(u)
+            for d, v in adj[u]:
+                if (o[d] >> u) & 1 and field[v] == du + 1:
+                    heappush(suspects, (du + 1, v))
+
+        log = [(u, field[u]) for u in affected]
+        heap = []
+        for u in affected:
+            best = UNREACHABLE
+            for d, v in adj[u]:
+                if (o[d] >> u) & 1 and v not in affected and field[v] + 1 < best:
+                    best = field[v] + 1
+            field[u] = best
+            if best < UNREACHABLE:
+                heap.append((best, u))
+        heapq.heapify(heap)
+        while heap:
+            du, u = heappop(heap)
+            if du > field[u]:
+                continue
+            for d, v in adj[u]:
+                if (o[d] >> u) & 1 and du + 1 < field[v] and v in affected:
+                    field[v] = du + 1
+                    heappush(heap, (du + 1, v))
+        return log
+
+    def _lower_field(self, field, opened):
+        """Repairs field after the given edges were opened."""
+        _floods[0] += 1
+        o = self.open
+        adj = self.t.adj
+        heap = []
+        for a, b in opened:
+            if field[a] > field[b] + 1:
+                field[a] = field[b] + 1
+                heap.append((field[a], a))
+            elif field[b] > field[a] + 1:
+                field[b] = field[a] + 1
+                heap.append((field[b], b))
+        heapq.heapify(heap)
+        while heap:
+            du, u = heapq.heappop(heap)
+            if du > field[u]:
+                continue
+            for d, v in adj[u]:
+                if (o[d] >> u) & 1 and field[v] > du + 1:
+                    field[v] = du + 1
+                    heapq.heappush(heap, (du + 1, v))
@@ -1,96 +1,131 @@
-import numpy as np
+from BitBoard import BitBoard
+from Config import TYPE_WALL, TRACE_PATH
+from GameRecord import GameRecordWriter, RecordError, to_text, from_text, move_to_text
+from MoveLog import MoveLog
 from Player import Player
 from AIPlayer import AIPlayer
+from MCTSPlayer import MCTSPlayer
+from Rules import legal_moves
 
 class Board:
     def __init__(self, size=9, vs_ai_mode=False):
+        """vs_ai_mode: False for two humans, True (or "minimax") for the alpha-beta AI, "mcts" for tree search."""
         self.pawn_dim = size
         self.wall_dim = size - 1
         self.total_dim = self.pawn_dim + self.wall_dim
 
-        self.grid = np.zeros((self.total_dim, self.total_dim), dtype=int)
+        self.state = BitBoard(size)
         self.vs_ai = vs_ai_mode
 
-        self.history = []
-        self.redo_stack = []
+        self.p1 = Player(1, self, pos=self.state.to_grid(self.state.pawns[0]), objective_row=0)
 
-        self.p1 = Player(1, self, pos=np.array([16, 8], dtype=int), objective_row=0)
-        
-        start_pos_p2 = np.array([0, 8], dtype=int)
+        start_pos_p2 = self.state.to_grid(self.state.pawns[1])
         goal_p2 = self.total_dim - 1
-        
-        if self.vs_ai:
-            self.p2 = AIPlayer(2, self, pos=start_pos_p2, objective_row=goal_p2)
+
+        if self.vs_ai == "mcts":
+            self.p2 = MCTSPlayer(2, self, pos=start_pos_p2, objective_row=goal_p2)
+        elif self.vs_ai:
+            # Iterative deepening stops at the time budget, so the depth is only a ceiling.
+            self.p2 = AIPlayer(2, self, pos=start_pos_p2, objective_row=goal_p2, search_depth=8,
+                               trace_path=TRACE_PATH)
         else:
             self.p2 = Player(2, self, pos=start_pos_p2, objective_row=goal_p2)
 
         self.active_player = self.p1
+        self.log = MoveLog(self.state)
+
+    def grid_value(self, r, c):
+        """Reads one square of the 17x17 display grid from the bitboard state."""
+        return self.state.grid_value(r, c)
 
-    def save_snapshot(self):
-        """Saves current state to history. Does NOT clear redo stack automatically anymore."""
-        snapshot = {
-            "grid": self.grid.copy(),
-            "p1_pos": self.p1.pos.copy(),
-            "p1_walls": self.p1.walls_left,
-            "p2_pos": self.p2.pos.copy(),
-            "p2_walls": self.p2.walls_left,
-            "active_player_id": self.active_player.id
-        }
-        self.history.append(snapshot)
-
-    def clear_redo(self):
-        """Explicitly clears the redo stack (call this only after a VALID move)."""
-        self.redo_stack.clear()
+    def play(self, idx, move):
+        """Applies a legal move for player idx and records it in the move log."""
+        self.log.record(self.state, idx, move)
+        self.state.apply(idx, move)
+
+    def place_wall(self, player, coords):
+        """Places a wall given as three display-grid cells. Returns an error message, or None on success."""
+        if player.walls_left <= 0:
+            return "No walls left!"
+        wall = self.state.wall_from_grid(coords)
+        if wall is None:
+            return "Invalid Shape"
+        slot, orient = wall
+        if not self.state.wall_fits(slot, orient):
+            return "Occupied!"
+        if not self.state.wall_keeps_paths(slot, orient):
+            return "Blocks Path!"
+        self.play(player.idx, (TYPE_WALL, slot, orient))
+        return None
 
     def undo(self):
-        if not self.history: return False
-
-        current_state = {
-            "grid": self.grid.copy(),
-            "p1_pos": self.p1.pos.copy(),
-            "p1_walls": self.p1.walls_left,
-            "p2_pos": self.p2.pos.copy(),
-            "p2_walls": self.p2.walls_left,
-            "active_player_id": self.active_player.id
-        }
-        self.redo_stack.append(current_state)
-
-        prev = self.history.pop()
-        self._apply_state(prev)
+        if not self.log.can_undo(): return False
+
+        self.log.undo(self.state)
+        self._sync_active_player()
+        if self.vs_ai:
+            self.p2.clear_search()
         return True
 
-    def redo(self):
-        if not self.redo_stack: return False
-
-        current_state = {
-            "grid": self.grid.copy(),
-            "p1_pos": self.p1.pos.copy(),
-            "p1_walls": self.p1.walls_left,
-            "p2_pos": self.p2.pos.copy(),
-            "p2_walls": self.p2.walls_left,
-            "active_player_id": self.active_player.id
-        }
-        self.history.append(current_state)
-
-        future = self.redo_stack.pop()
-        self._apply_state(future)
+    def redo(self, variation=None):
+        """Steps forward along the current line, or into the given variation index. False if there is none."""
+        if not self.log.can_redo(variation): return False
+
+        self.log.redo(self.state, variation)
+        self._sync_active_player()
         return True
 
-    def _apply_state(self, state):
-        self.grid = state["grid"].copy()
-        self.p1.pos = state["p1_pos"].copy()
-        self.p1.walls_left = state["p1_walls"]
-        self.p2.pos = state["p2_pos"].copy()
-        self.p2.walls_left = state["p2_walls"]
-        
-        if state["active_player_id"] == 1:
-            self.active_player = self.p1
-        else:
-            self.active_player = self.p2
+    def seek(self, ply):
+        """Jumps to any ply of the current line."""
+        self.state = self.log.seek(ply)
+        self._sync_active_player()
+        if self.vs_ai:
+            self.p2.clear_search()
+
+    def _sync_active_player(self):
+        self.active_player = self.p1 if self.log.to_move() == 0 else self.p2
 
     def get_snapshot(self):
-        return [
-            [self.p1.pos.copy(), self.p1.walls_left],
-            [self.p2.pos.copy(), self.p2.walls_left],
-            self.grid.copy()
-        ]
\ No newline at end of file
+        return self.state.copy()
+
+    def played_moves(self):
+        """Moves from the start up to the current position (undone moves are left out)."""
+        return [move for _, move in self.log.moves()[:self.log.current.ply]]
+
+    def export_text(self):
+        """The game so far in text notation, e.g. "e2 e8 e3h"."""
+        return to_text(self.played_moves(), self.pawn_dim)
+
+    @property
+    def winner(self):
+        """1 or 2 once that player has reached their goal row, else 0."""
+        return next((i + 1 for i in (0, 1) if self.state.at_goal(i)), 0)
+
+    def load_text(self, text):
+        """Starts over from the initial position and plays a game given in text notation.
+
+        Every ply is checked against the rules; on the first illegal one, or a move after the
+        game has ended, RecordError is raised and the board is left as it was.
+        """
+        state = BitBoard(self.pawn_dim)
+        log = MoveLog(state)
+        for ply, move in enumerate(from_text(text, self.pawn_dim)):
+            idx = ply % 2
+            if state.at_goal(0) or state.at_goal(1):
+                raise RecordError(f"move after the end of the game at ply {ply + 1}")
+            if move not in legal_moves(state, idx):
+                raise RecordError(f"illegal move {move_to_text(move, self.pawn_dim)} at ply {ply + 1}")
+            log.record(state, idx, move)
+            state.apply(idx, move)
+        self.state, self.log = state, log
+        self._sync_active_player()
+        if self.vs_ai:
+            self.p2.clear_search()
+
+    def archive(self, path):
+        """Appends the game so far to a binary game archive; does nothing before the first move."""
+        moves = self.played_moves()
+        if not moves:
+            return
+        with GameRecordWriter(path, append=True) as writer:
+            writer.write(moves, self.pawn_dim, self.winner)
@@ -3,6 +3,10 @@ VERTICAL = 2
 TYPE_PAWN = 0
 TYPE_WALL = 1
 
+ARCHIVE_PATH = "games.qgr"
+# Set to a file name to log every AI search (move, PV, statistics) as JSON lines.
+TRACE_PATH = None
+
 THEME = {
     "background": "#050505",      
     "board_bg": "#121212",       
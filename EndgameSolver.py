@@ -0,0 +1,179 @@
+from collections import OrderedDict, deque
+from array import array
+
+from BitBoard import DIRECTIONS, UP, DOWN, LEFT, RIGHT
+from Config import TYPE_PAWN
+
+UNKNOWN, WIN, LOSS = 0, 1, 2
+
+_SIDESTEPS = {UP: (LEFT, RIGHT), DOWN: (LEFT, RIGHT), LEFT: (UP, DOWN), RIGHT: (UP, DOWN)}
+
+
+class _Table:
+    """Solved race for one wall layout: outcome and distance to the end for every (p1, p2, side to move)."""
+    __slots__ = ("cells", "steps", "result", "plies")
+
+    def __init__(self, cells, steps, result, plies):
+        self.cells = cells
+        self.steps = steps          # steps[cell] = {direction: neighbour} through open edges
+        self.result = result        # UNKNOWN (endless, a draw), WIN or LOSS for the side to move
+        self.plies = plies          # plies until the game ends with best play
+
+    def index(self, pawns, side):
+        return (pawns[0] * self.cells + pawns[1]) * 2 + side
+
+    def targets(self, me, opp):
+        """Pawn destinations with the full rules: steps, straight jumps, and side-steps when a jump is blocked."""
+        steps = self.steps
+        out = []
+        for d, n in steps[me].items():
+            if n != opp:
+                out.append(n)
+                continue
+            j = steps[n].get(d)
+            if j is not None:
+                out.append(j)
+                continue
+            for side in _SIDESTEPS[d]:
+                s = steps[n].get(side)
+                if s is not None and s not in out:
+                    out.append(s)
+        return out
+
+
+class EndgameSolver:
+    """Exact play once both players are out of walls.
+
+    With no walls left the board never changes again, so the game is a pawn race over
+    cells x cells x 2 states. Each layout is solved once by retrograde analysis: starting
+    from finished games, a position is won if some move reaches a lost one, and lost once
+    every move reaches a won one. Tables for the last few layouts are kept.
+    """
+    def __init__(self, cache_size=4):
+        self.cache_size = cache_size
+        self._tables = OrderedDict()
+
+    @staticmethod
+    def applies(state):
+        return not state.walls_left[0] and not state.walls_left[1]
+
+    def table(self, state, solve=True):
+        key = (state.size, state.hwalls, state.vwalls)
+        table = self._tables.get(key)
+        if table is not None:
+            self._tables.move_to_end(key)
+        elif solve:
+            table = self._tables[key] = self._solve(state)
+            if len(self._tables) > self.cache_size:
+                self._tables.popitem(last=False)
+        return table
+
+    def _solve(self, state):
+        n = state.size
+        cells = n * n
+        steps = []
+        for cell in range(cells):
+            nbrs = {}
+            for d in DIRECTIONS:
+                m = state.step(cell, d)
+                if m >= 0:
+                    nbrs[d] = m
+            steps.append(nbrs)
+
+        total = cells * cells * 2
+        result = bytearray(total)
+        plies = array("H", bytes(2 * total))
+        remaining = [0] * total
+        preds = [[] for _ in range(total)]
+        table = _Table(cells, steps, result, plies)
+        queue = deque()
+
+        goal = (0, n - 1)
+        for a in range(cells):
+            a_done = a // n == goal[0]
+            for b in range(cells):
+                if a == b:
+                    continue
+                b_done = b // n == goal[1]
+                for side in (0, 1):
+                    s = (a * cells + b) * 2 + side
+                    if a_done or b_done:
+                        # The game is over; it was lost by the side to move unless its own pawn got home.
+                        result[s] = WIN if (a_done, b_done)[side] else LOSS
+                        queue.append(s)
+                        continue
+                    if side == 0:
+                        succ = [(t * cells + b) * 2 + 1 for t in table.targets(a, b)]
+                    else:
+                        succ = [(a * cells + t) * 2 for t in table.targets(b, a)]
+                    remaining[s] = len(succ)
+                    for t in succ:
+                        preds[t].append(s)
+                    if not succ:
+                        result[s] = LOSS
+                        queue.append(s)
+
+        # Breadth-first from finished games, so every state gets its shortest win or longest loss.
+        while queue:
+            t = queue.popleft()
+            lost = result[t] == LOSS
+            for p in preds[t]:
+                if result[p]:
+                    continue
+                if lost:
+                    result[p] = WIN
+                else:
+                    remaining[p] -= 1
+                    if remaining[p]:
+                        continue
+                    result[p] = LOSS
+                plies[p] = plies[t] + 1
+                queue.append(p)
+        return table
+
+    def lookup(self, state, idx, solve=True):
+        """(outcome, plies) for player idx to move: outcome is WIN, LOSS or UNKNOWN (no one can force a win).
+
+        Returns None when the layout is not solved yet and solve is False.
+        """
+        table = self.table(state, solve)
+        if table is None:
+            return None
+        s = table.index(state.pawns, idx)
+        return table.result[s], table.plies[s]
+
+    def best_move(self, state, idx):
+        """Fastest win, slowest loss, or a move that keeps an endless game endless."""
+        table = self.table(state)
+        me, opp = state.pawns[idx], state.pawns[1 - idx]
+        best, best_rank = None, None
+        for t in table.targets(me, opp):
+            pawns = [t, opp] if idx == 0 else [opp, t]
+            s = table.index(pawns, 1 - idx)
+            result, plies = table.result[s], table.plies[s]
+            if result == LOSS:
+                rank = (0, plies)
+            elif result == UNKNOWN:
+                rank = (1, state.fields[idx][t])
+            else:
+                rank = (2, -plies)
+            if best_rank is None or rank < best_rank:
+                best, best_rank = t, rank
+        return None if best is None else (TYPE_PAWN, best)
+
+    def principal_variation(self, state, idx, limit=40):
+        """Best play from state as a list of moves; state is left unchanged."""
+        pv = []
+        played = []
+        for _ in range(limit):
+            move = self.best_move(state, idx)
+            if move is None:
+                break
+            pv.append(move)
+            played.append((idx, move, state.apply(idx, move)))
+            if state.at_goal(idx):
+                break
+            idx = 1 - idx
+        for mover, move, token in reversed(played):
+            state.undo(mover, move, token)
+        return pv
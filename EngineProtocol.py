@@ -0,0 +1,279 @@
+"""Headless engine that speaks a UCI-style line protocol on stdin/stdout.
+
+    python EngineProtocol.py --hash 64
+
+The process stays up between commands, so the transposition table, history, opening book
+and endgame tables stay warm. Commands:
+
+    uci                               identify; answers "id ...", "option ..." and "uciok"
+    isready                           answers "readyok"
+    ucinewgame                        forget everything learned so far
+    setoption name <N> value <V>      Hash (MB), Selective (also on 9x9), OwnBook, Endgame
+    position startpos [moves ...]     moves in GameRecord notation: "e2", "e3h"
+    position fen <6 fields> [moves ...]   e.g. "position fen 9 e1 e9 10/10 - 1 moves e2"
+    go [depth N] [movetime MS] [nodes N] [wtime MS btime MS winc MS binc MS] [infinite] [ponder]
+    ponderhit                         the pondered move was played: the go's time limit starts now
+    stop                              end the search now; bestmove follows
+    quit
+
+While searching, the engine sends one line per finished iteration:
+
+    info depth 3 score cp 150 nodes 20811 nps 13620 time 1528 pv e7 e3 e6
+
+Scores are the side to move's view in hundredths of a step; a forced result is "score win"
+or "score loss". The search ends with "bestmove <move> [ponder <move>]", or
+"bestmove (none)" when the game is already over. Without limits, go uses the engine's
+defaults. "go infinite" runs until stop, and "go ponder" runs until stop or ponderhit; in
+both cases bestmove is held back until then, even if the search ends early.
+"""
+import argparse
+import math
+import sys
+import threading
+import time
+
+from EndgameSolver import EndgameSolver
+from GameRecord import RecordError, START_FEN, from_fen, move_from_text, move_to_text
+from OpeningBook import OpeningBook
+from Rules import legal_moves
+from SearchEngine import SearchEngine
+from TranspositionTable import TranspositionTable
+
+ENGINE_NAME = "Quoridor"
+MAX_DEPTH = 64
+
+
+class EngineProtocol:
+    """Reads commands, drives one long-lived SearchEngine, writes replies.
+
+    Searches run on a background thread so that "stop" and "isready" are answered while
+    the engine thinks.
+    """
+    def __init__(self, engine, out=sys.stdout):
+        self.engine = engine
+        self.out = out
+        self.defaults = (engine.depth, engine.time_budget, engine.node_budget)
+        self.state, self.idx = from_fen(START_FEN)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._release = threading.Event()   # set once bestmove may be sent
+        self._thread = None
+        self._started = 0.0
+        self._pondering = False
+        self._ponder_budget = None
+        self._deadline = None
+        engine.should_stop = self._should_stop
+        engine.on_iteration = self._report
+
+    def send(self, line):
+        with self._lock:
+            self.out.write(line + "\n")
+            self.out.flush()
+
+    def run(self, inp=sys.stdin):
+        for line in inp:
+            if not self.handle(line):
+                break
+        self._halt()
+
+    def handle(self, line):
+        """Runs one command. Returns False on quit."""
+        words = line.split()
+        if not words:
+            return True
+        cmd, args = words[0], words[1:]
+        try:
+            if cmd == "quit":
+                return False
+            elif cmd == "uci":
+                self.send(f"id name {ENGINE_NAME}")
+                self.send(f"option name Hash type spin default {self.engine.tt_size_mb} min 1 max 4096")
+                self.send(f"option name Selective type check default {str(self.engine.selective is True).lower()}")
+                self.send(f"option name OwnBook type check default {str(self.engine.book is not None).lower()}")
+                self.send(f"option name Endgame type check default {str(self.engine.endgame is not None).lower()}")
+                self.send("uciok")
+            elif cmd == "isready":
+                self.send("readyok")
+            elif cmd == "ucinewgame":
+                self._halt()
+                self.engine.clear()
+                self.engine.time_bank = 0.0
+            elif cmd == "setoption":
+                self._halt()
+                self._setoption(args)
+            elif cmd == "position":
+                self._halt()
+                self._position(args)
+            elif cmd == "go":
+                self._halt()
+                self._go(args)
+            elif cmd == "stop":
+                self._stop.set()
+                self._release.set()
+            elif cmd == "ponderhit":
+                self._ponderhit()
+            else:
+                self.send(f"info string unknown command {cmd}")
+        except (RecordError, ValueError, IndexError) as e:
+            self.send(f"info string error: {e}")
+        return True
+
+    def _setoption(self, args):
+        if "name" not in args or "value" not in args:
+            raise ValueError("usage: setoption name <name> value <value>")
+        name = " ".join(args[args.index("name") + 1:args.index("value")]).lower()
+        value = " ".join(args[args.index("value") + 1:])
+        flag = value.lower() == "true"
+        engine = self.engine
+        if name == "hash":
+            engine.tt_size_mb = int(value)
+            engine.tt = TranspositionTable(engine.tt_size_mb)
+        elif name == "selective":
+            engine.selective = True if flag else None
+        elif name == "ownbook":
+            engine.book = OpeningBook() if flag else None
+        elif name == "endgame":
+            engine.endgame = EndgameSolver() if flag else None
+        else:
+            raise ValueError(f"unknown option {name!r}")
+
+    def _position(self, args):
+        if not args:
+            raise ValueError("usage: position startpos | fen <position> [moves ...]")
+        if args[0] == "startpos":
+            fen, rest = START_FEN, args[1:]
+        elif args[0] == "fen":
+            end = args.index("moves") if "moves" in args else len(args)
+            fen, rest = " ".join(args[1:end]), args[end:]
+        else:
+            raise ValueError(f"unknown position type {args[0]!r}")
+        state, idx = from_fen(fen)
+        if rest and rest[0] == "moves":
+            for token in rest[1:]:
+                move = move_from_text(token, state.size)
+                if state.at_goal(0) or state.at_goal(1) or move not in legal_moves(state, idx):
+                    raise RecordError(f"illegal move {token}")
+                state.apply(idx, move)
+                idx = 1 - idx
+        self.state, self.idx = state, idx
+
+    def _go(self, args):
+        """Sets this search's limits and starts it. Explicit limits replace the defaults."""
+        engine = self.engine
+        opts = {}
+        i = 0
+        while i < len(args):
+            if args[i] in ("infinite", "ponder"):
+                opts[args[i]] = True
+                i += 1
+            elif i + 1 < len(args):
+                opts[args[i]] = int(args[i + 1])
+                i += 2
+            else:
+                raise ValueError(f"go {args[i]} needs a value")
+        ponder = opts.pop("ponder", False)
+
+        depth, budget, nodes = self.defaults
+        if opts:
+            depth, budget, nodes = MAX_DEPTH, None, None
+            if "depth" in opts:
+                # The engine's depth counts plies below the root move.
+                depth = max(0, opts["depth"] - 1)
+            if "nodes" in opts:
+                nodes = opts["nodes"]
+            if "movetime" in opts:
+                budget = opts["movetime"] / 1000
+            clock, inc = ("wtime", "winc") if self.idx == 0 else ("btime", "binc")
+            if clock in opts:
+                # A slice of the remaining clock, never more than half of it.
+                budget = min(opts[clock] / 2, opts[clock] / 30 + opts.get(inc, 0)) / 1000
+            # The caller keeps the clock, so time saved on book moves is not spent later.
+            engine.time_bank = 0.0
+        self._pondering = ponder
+        self._deadline = None
+        if ponder:
+            # No time limit until ponderhit; the budget then runs from that moment.
+            self._ponder_budget, budget = budget, None
+        engine.depth, engine.time_budget, engine.node_budget = depth, budget, nodes
+
+        self._stop.clear()
+        if ponder or "infinite" in opts:
+            self._release.clear()
+        else:
+            self._release.set()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._search, args=(self.state.copy(), self.idx), daemon=True)
+        self._thread.start()
+
+    def _search(self, state, idx):
+        engine = self.engine
+        size = state.size
+        if state.at_goal(0) or state.at_goal(1):
+            self._release.wait()
+            self.send("bestmove (none)")
+            return
+        move = engine.search(state, idx)
+        if engine.stats.source != "search":
+            self.send(f"info depth 0 score {_score(engine.best_value)} pv "
+                      f"{' '.join(move_to_text(m, size) for m in engine.pv)} string {engine.stats.source}")
+        self._release.wait()
+        if move is None:
+            self.send("bestmove (none)")
+            return
+        line = f"bestmove {move_to_text(move, size)}"
+        if len(engine.pv) > 1 and engine.pv[0] == move:
+            line += f" ponder {move_to_text(engine.pv[1], size)}"
+        self.send(line)
+
+    def _report(self, engine):
+        elapsed = time.perf_counter() - self._started
+        pv = " ".join(move_to_text(m, self.state.size) for m in engine.pv)
+        nps = round(engine.nodes / elapsed) if elapsed > 0 else 0
+        self.send(f"info depth {engine.completed_depth} score {_score(engine.best_value)} "
+                  f"nodes {engine.nodes} nps {nps} time {round(elapsed * 1000)} pv {pv}")
+
+    def _ponderhit(self):
+        """The opponent played the pondered move: keep searching, now against the go's budget."""
+        if not self._pondering:
+            return
+        self._pondering = False
+        if self._ponder_budget is not None:
+            self._deadline = time.perf_counter() + self._ponder_budget
+        self._release.set()
+
+    def _should_stop(self):
+        return self._stop.is_set() or (self._deadline is not None and time.perf_counter() >= self._deadline)
+
+    def _halt(self):
+        """Stops a running search and waits for its bestmove."""
+        if self._thread is not None:
+            self._stop.set()
+            self._release.set()
+            self._thread.join()
+            self._thread = None
+
+
+def _score(value):
+    if math.isinf(value):
+        return "win" if value > 0 else "loss"
+    return f"cp {round(value * 100)}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quoridor engine speaking a UCI-style protocol on stdin/stdout.")
+    parser.add_argument("--depth", type=int, default=8, help="default depth for go without limits")
+    parser.add_argument("--time", type=float, default=2.0, help="default seconds for go without limits")
+    parser.add_argument("--nodes", type=int, default=None)
+    parser.add_argument("--hash", type=int, default=16, help="transposition table size in MB")
+    parser.add_argument("--no-book", action="store_true")
+    args = parser.parse_args(argv)
+    engine = SearchEngine(search_depth=args.depth, time_budget=args.time, node_budget=args.nodes,
+                          tt_size_mb=args.hash, book=None if args.no_book else OpeningBook())
+    try:
+        EngineProtocol(engine).run()
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
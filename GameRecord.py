@@ -0,0 +1,258 @@
+"""Game records: text notation and a packed binary archive.
+
+Text notation
+    Columns are letters from 'a', rows are numbers from 1 on player 1's starting side, so
+    player 1 starts on e1 and player 2 on e9. A pawn move is the destination square ("e2").
+    A wall is the square just below-left of its centre plus 'h' or 'v' ("e3h").
+
+Position strings
+    Six space-separated fields: board size, player 1's square, player 2's square, walls
+    left as "p1/p2", the placed walls comma-separated (or "-"), and the side to move (1 or 2).
+    The initial position is "9 e1 e9 10/10 - 1".
+
+Binary archive (.qgr)
+    b"QGR1" magic, then one record per game: size (u8), result (u8: 0 none, 1/2 winner),
+    ply count (u16), then the moves at one byte each (two bytes on boards bigger than 9x9).
+    A byte below 128 is a pawn destination cell; 128 and up is 128 + slot * 2 + (orientation - 1).
+    Closing a writer appends an index of record offsets and a footer, which lets the reader
+    jump straight to game i. A file without a footer is still readable sequentially.
+"""
+import mmap
+import os
+import struct
+
+from Config import TYPE_PAWN, TYPE_WALL, HORIZONTAL, VERTICAL
+
+MAGIC = b"QGR1"
+FOOTER_MAGIC = b"QGRI"
+_GAME_HEADER = struct.Struct("<BBH")
+_FOOTER = struct.Struct("<QI4s")
+
+
+class RecordError(ValueError):
+    """Raised for malformed notation or archive data."""
+
+
+# --- text notation ----------------------------------------------------
+
+def move_to_text(move, size=9):
+    if move[0] == TYPE_PAWN:
+        r, c = divmod(move[1], size)
+        return f"{chr(ord('a') + c)}{size - r}"
+    y, x = divmod(move[1], size - 1)
+    return f"{chr(ord('a') + x)}{size - (y + 1)}{'h' if move[2] == HORIZONTAL else 'v'}"
+
+
+def move_from_text(token, size=9):
+    token = token.strip().lower()
+    orient = None
+    if token[-1:] in ("h", "v"):
+        orient = HORIZONTAL if token[-1] == "h" else VERTICAL
+        token = token[:-1]
+    if len(token) < 2 or not token[0].isalpha() or not token[1:].isdigit():
+        raise RecordError(f"bad move {token!r}")
+    c = ord(token[0]) - ord("a")
+    r = size - int(token[1:])
+    if orient is None:
+        if not (0 <= r < size and 0 <= c < size):
+            raise RecordError(f"square {token!r} is off the board")
+        return (TYPE_PAWN, r * size + c)
+    y = r - 1
+    if not (0 <= y < size - 1 and 0 <= c < size - 1):
+        raise RecordError(f"wall {token!r} is off the board")
+    return (TYPE_WALL, y * (size - 1) + c, orient)
+
+
+def to_text(moves, size=9):
+    """Space-separated notation for a list of engine moves."""
+    return " ".join(move_to_text(m, size) for m in moves)
+
+
+def from_text(text, size=9):
+    return [move_from_text(tok, size) for tok in text.split()]
+
+
+START_FEN = "9 e1 e9 10/10 - 1"
+
+
+def to_fen(state, idx):
+    """Position string for state with player idx (0 or 1) to move."""
+    size = state.size
+    walls = [(TYPE_WALL, slot, HORIZONTAL) for slot in range((size - 1) ** 2) if state.hwalls >> slot & 1]
+    walls += [(TYPE_WALL, slot, VERTICAL) for slot in range((size - 1) ** 2) if state.vwalls >> slot & 1]
+    return " ".join([
+        str(size),
+        move_to_text((TYPE_PAWN, state.pawns[0]), size),
+        move_to_text((TYPE_PAWN, state.pawns[1]), size),
+        f"{state.walls_left[0]}/{state.walls_left[1]}",
+        ",".join(move_to_text(w, size) for w in walls) or "-",
+        str(idx + 1),
+    ])
+
+
+def from_fen(text):
+    """Parses a position string into (BitBoard, index of the side to move)."""
+    from BitBoard import BitBoard
+
+    fields = text.split()
+    if len(fields) != 6:
+        raise RecordError(f"position needs 6 fields, got {len(fields)}")
+    size_s, p1, p2, left, walls, side = fields
+    if not size_s.isdigit() or not 3 <= int(size_s) <= 26 or int(size_s) % 2 == 0:
+        raise RecordError(f"bad board size {size_s!r}")
+    size = int(size_s)
+    counts = left.split("/")
+    if len(counts) != 2 or not all(c.isdigit() and int(c) < 32 for c in counts):
+        raise RecordError(f"bad wall counts {left!r}")
+    if side not in ("1", "2"):
+        raise RecordError(f"bad side to move {side!r}")
+
+    state = BitBoard(size)
+    cells = []
+    for token in (p1, p2):
+        move = move_from_text(token, size)
+        if move[0] != TYPE_PAWN:
+            raise RecordError(f"bad pawn square {token!r}")
+        cells.append(move[1])
+    if cells[0] == cells[1]:
+        raise RecordError("both pawns on the same square")
+    for idx in (0, 1):
+        state.move_pawn(idx, cells[idx])
+        state.set_walls_left(idx, int(counts[idx]))
+    for token in ([] if walls == "-" else walls.split(",")):
+        move = move_from_text(token, size)
+        if move[0] != TYPE_WALL or not state.wall_fits(move[1], move[2]):
+            raise RecordError(f"wall {token!r} overlaps another or is not a wall")
+        if not state.wall_keeps_paths(move[1], move[2]):
+            raise RecordError(f"wall {token!r} cuts a player off from the goal")
+        state.place_wall(move[1], move[2])
+    return state, int(side) - 1
+
+
+# --- binary encoding --------------------------------------------------
+
+def _move_width(size):
+    return 1 if size * size <= 128 and 2 * (size - 1) ** 2 <= 128 else 2
+
+
+def encode_move(move, size=9):
+    if move[0] == TYPE_PAWN:
+        return move[1]
+    code = move[1] * 2 + (move[2] - 1)
+    return 128 + code if _move_width(size) == 1 else 0x8000 | code
+
+
+def decode_move(code, size):
+    if _move_width(size) == 1:
+        if code < 128:
+            return (TYPE_PAWN, code)
+        code -= 128
+    else:
+        if not code & 0x8000:
+            return (TYPE_PAWN, code)
+        code &= 0x7FFF
+    return (TYPE_WALL, code >> 1, (code & 1) + 1)
+
+
+def encode_game(moves, size=9, result=0):
+    codes = [encode_move(move, size) for move in moves]
+    body = bytes(codes) if _move_width(size) == 1 else struct.pack(f"<{len(codes)}H", *codes)
+    return _GAME_HEADER.pack(size, result, len(moves)) + body
+
+
+class GameRecordWriter:
+    """Appends games to an archive one at a time; close() writes the index."""
+    def __init__(self, path, append=False):
+        self.offsets = []
+        if append and os.path.exists(path) and os.path.getsize(path) > 0:
+            with GameRecordReader(path) as reader:
+                self.offsets = list(reader.offsets)
+                end = reader.data_end
+            self.f = open(path, "r+b")
+            self.f.truncate(end)
+            self.f.seek(end)
+        else:
+            self.f = open(path, "wb")
+            self.f.write(MAGIC)
+
+    def write(self, moves, size=9, result=0):
+        self.offsets.append(self.f.tell())
+        self.f.write(encode_game(moves, size, result))
+
+    def close(self):
+        if self.f is None:
+            return
+        index_at = self.f.tell()
+        self.f.write(struct.pack(f"<{len(self.offsets)}Q", *self.offsets))
+        self.f.write(_FOOTER.pack(index_at, len(self.offsets), FOOTER_MAGIC))
+        self.f.close()
+        self.f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GameRecordReader:
+    """Memory-mapped archive reader: len(), reader[i] and iteration without loading the file."""
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        size = os.path.getsize(path)
+        if size < len(MAGIC):
+            raise RecordError(f"{path} is not a game archive")
+        self.mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mm[:len(MAGIC)] != MAGIC:
+            raise RecordError(f"{path} is not a game archive")
+
+        self.data_end = size
+        self.offsets = None
+        if size >= len(MAGIC) + _FOOTER.size:
+            index_at, count, magic = _FOOTER.unpack_from(self.mm, size - _FOOTER.size)
+            if magic == FOOTER_MAGIC:
+                self.offsets = memoryview(self.mm)[index_at:index_at + 8 * count].cast("Q")
+                self.data_end = index_at
+        if self.offsets is None:
+            self.offsets = list(self._scan())
+
+    def _scan(self):
+        pos = len(MAGIC)
+        while pos + _GAME_HEADER.size <= self.data_end:
+            size, _, plies = _GAME_HEADER.unpack_from(self.mm, pos)
+            yield pos
+            pos += _GAME_HEADER.size + plies * _move_width(size)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, i):
+        """Returns (moves, size, result) for game i."""
+        return self._read(self.offsets[i])
+
+    def __iter__(self):
+        for offset in self.offsets:
+            yield self._read(offset)
+
+    def _read(self, pos):
+        size, result, plies = _GAME_HEADER.unpack_from(self.mm, pos)
+        pos += _GAME_HEADER.size
+        width = _move_width(size)
+        if width == 1:
+            codes = self.mm[pos:pos + plies]
+        else:
+            codes = struct.unpack_from(f"<{plies}H", self.mm, pos)
+        return [decode_move(code, size) for code in codes], size, result
+
+    def close(self):
+        if isinstance(self.offsets, memoryview):
+            self.offsets.release()
+        self.offsets = []
+        self.mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
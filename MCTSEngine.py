@@ -0,0 +1,328 @@
+from Config import TYPE_PAWN, TYPE_WALL, HORIZONTAL, VERTICAL
+from BitBoard import BitBoard, iter_bits
+from EndgameSolver import EndgameSolver, WIN, LOSS
+from Rules import legal_moves, pawn_moves
+import math
+import multiprocessing
+import random
+import time
+
+# Cap on root visits while pondering, so a long think by the opponent cannot grow the tree without bound.
+PONDER_LIMIT = 200000
+
+class _Node:
+    __slots__ = ("move", "parent", "mover", "key", "terminal", "children", "untried", "visits", "wins")
+
+    def __init__(self, move, parent, mover, key, terminal=False):
+        self.move = move
+        self.parent = parent
+        self.mover = mover          # player who played self.move
+        self.key = key              # position hash after self.move
+        self.terminal = terminal
+        self.children = []
+        self.untried = None         # generated on first expansion
+        self.visits = 0
+        self.wins = 0.0             # from the point of view of self.mover
+
+
+class MCTSEngine:
+    """Monte Carlo tree search (UCT) over a BitBoard, a drop-in alternative to SearchEngine.
+
+    Playouts are short: a few plies of shortest-path-biased pawn moves with the odd
+    wall across the opponent's path, then the race is decided from the distance fields.
+    rollouts_per_leaf > 1 batches several playouts per expanded leaf. The subtree
+    under the move actually played is kept for the next search.
+    """
+    def __init__(self, iterations=None, time_budget=2.0, exploration=1.4, rollout_plies=8,
+                 rollouts_per_leaf=1, wall_rate=0.1, greedy_rate=0.8, workers=1, seed=None):
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.exploration = exploration
+        self.rollout_plies = rollout_plies
+        self.rollouts_per_leaf = rollouts_per_leaf
+        self.wall_rate = wall_rate
+        self.greedy_rate = greedy_rate
+        self.workers = workers
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.endgame = EndgameSolver()
+        self.should_stop = None
+
+        self.root = None
+        self.playouts_per_search = 0
+        self.playouts = 0
+        self.nodes = 0
+        self.best_value = 0.0
+        self.pv = []
+        self._pool = None
+
+    def config(self):
+        return {
+            "iterations": self.iterations,
+            "time_budget": self.time_budget,
+            "exploration": self.exploration,
+            "rollout_plies": self.rollout_plies,
+            "rollouts_per_leaf": self.rollouts_per_leaf,
+            "wall_rate": self.wall_rate,
+            "greedy_rate": self.greedy_rate,
+        }
+
+    def clear(self):
+        self.root = None
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+
+    def search(self, state, idx):
+        """Best move for player idx in state. state is used as scratch space and restored."""
+        if self.endgame.applies(state):
+            result, _ = self.endgame.lookup(state, idx)
+            self.best_value = 1.0 if result == WIN else 0.0 if result == LOSS else 0.5
+            self.playouts = 0
+            self.nodes = 0
+            self.pv = self.endgame.principal_variation(state, idx)
+            self.root = None
+            return self.pv[0] if self.pv else None
+
+        if self.workers > 1:
+            return self._search_root_parallel(state, idx)
+
+        root = self._reuse_root(state, idx)
+        self.playouts = 0
+        self.nodes = 0
+        # A subtree grown while pondering may already hold a full search's worth of playouts.
+        if not (self.playouts_per_search and root.visits >= self.playouts_per_search):
+            self._run(state, root)
+            if self.should_stop is None or not self.should_stop():
+                self.playouts_per_search = self.playouts
+        if not root.children:
+            return None
+
+        best = max(root.children, key=lambda c: c.visits)
+        self.best_value = best.wins / best.visits
+        self.pv = self._principal_variation(best)
+        self.root = best
+        return best.move
+
+    def _reuse_root(self, state, idx):
+        """Finds the current position among the grandchildren of the last move we played."""
+        last = self.root
+        if last is not None and last.mover == idx:
+            for reply in last.children:
+                if reply.key == state.hash and reply.mover == 1 - idx:
+                    reply.parent = None
+                    return reply
+        return _Node(None, None, 1 - idx, state.hash)
+
+    def ponder(self, state, idx):
+        """Thinks on the opponent's time; state is the position after our last move.
+
+        Grows the subtree of each likely reply in turn (pawn moves along the opponent's
+        shortest path, then the replies visited most so far) up to a full search's worth
+        of playouts, until should_stop() is true. search() then reuses the subtree of
+        the reply actually played and answers at once if it is big enough.
+        """
+        root = self.root
+        if root is None or root.mover != idx or root.key != state.hash or root.terminal:
+            return
+        opp = 1 - idx
+        if root.untried is None:
+            root.untried = self._ordered_moves(state, opp)
+        field = state.fields[opp]
+        here = field[state.pawns[opp]]
+        replies = [m for m in pawn_moves(state, opp) if field[m[1]] < here]
+        replies += [c.move for c in sorted(root.children, key=lambda c: -c.visits) if c.move not in replies]
+        target = self.playouts_per_search or 1000
+
+        for move in replies:
+            if self.should_stop is not None and self.should_stop():
+                return
+            token = state.apply(opp, move)
+            child = next((c for c in root.children if c.move == move), None)
+            if child is None:
+                root.untried.remove(move)
+                child = _Node(move, root, opp, state.hash, state.at_goal(opp))
+                root.children.append(child)
+            if not child.terminal:
+                self._run(state, child, until_visits=target)
+            state.undo(opp, move, token)
+        self._run(state, root, until_visits=PONDER_LIMIT)
+
+    def _run(self, state, root, until_visits=None):
+        """Runs iterations from root until the time or iteration budget is spent, or, with
+        until_visits, until root has that many visits (pondering: no time limit).
+        """
+        deadline = time.perf_counter() + self.time_budget if self.time_budget else None
+        limit = self.iterations
+        if until_visits is not None:
+            deadline, limit = None, None
+        elif limit is None and deadline is None:
+            limit = 10000
+        done = 0
+        while True:
+            if limit is not None and done >= limit:
+                break
+            if until_visits is not None and root.visits >= until_visits:
+                break
+            if done & 15 == 0:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+                if self.should_stop is not None and self.should_stop():
+                    break
+            self._iterate(state, root)
+            done += 1
+
+    def _iterate(self, state, root):
+        node = root
+        played = []
+
+        # Selection: descend while every move here has been tried.
+        while not node.terminal and node.untried is not None and not node.untried and node.children:
+            node = self._select(node)
+            played.append((node.mover, node.move, state.apply(node.mover, node.move)))
+
+        # Expansion.
+        if not node.terminal:
+            if node.untried is None:
+                node.untried = self._ordered_moves(state, 1 - node.mover)
+            if node.untried:
+                move = node.untried.pop()
+                mover = 1 - node.mover
+                played.append((mover, move, state.apply(mover, move)))
+                child = _Node(move, node, mover, state.hash, state.at_goal(mover))
+                node.children.append(child)
+                node = child
+                self.nodes += 1
+
+        # Simulation.
+        if node.terminal:
+            wins = [0, 0]
+            wins[node.mover] = runs = self.rollouts_per_leaf
+        else:
+            runs = self.rollouts_per_leaf
+            wins = [0, 0]
+            for _ in range(runs):
+                wins[self._rollout(state, 1 - node.mover)] += 1
+        self.playouts += runs
+
+        # Backpropagation.
+        while node is not None:
+            node.visits += runs
+            node.wins += wins[node.mover]
+            node = node.parent
+
+        for mover, move, token in reversed(played):
+            state.undo(mover, move, token)
+
+    def _select(self, node):
+        log_n = math.log(node.visits)
+        c = self.exploration
+        best, best_score = None, -1.0
+        for child in node.children:
+            score = child.wins / child.visits + c * math.sqrt(log_n / child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    def _ordered_moves(self, state, idx):
+        """Untried moves, popped from the end: shuffled walls first in the list, pawn moves last."""
+        moves = legal_moves(state, idx)
+        walls = [m for m in moves if m[0] == TYPE_WALL]
+        pawns = [m for m in moves if m[0] == TYPE_PAWN]
+        self.rng.shuffle(walls)
+        field = state.fields[idx]
+        pawns.sort(key=lambda m: -field[m[1]])
+        return walls + pawns
+
+    def _rollout(self, state, to_move):
+        """Plays a short random game from state and returns the predicted winner."""
+        rng = self.rng
+        played = []
+        winner = None
+        idx = to_move
+        for _ in range(self.rollout_plies):
+            move = None
+            if state.walls_left[idx] and rng.random() < self.wall_rate:
+                move = self._rollout_wall(state, idx)
+            if move is None:
+                options = pawn_moves(state, idx)
+                if not options:
+                    winner = 1 - idx
+                    break
+                if rng.random() < self.greedy_rate:
+                    field = state.fields[idx]
+                    move = min(options, key=lambda m: field[m[1]])
+                else:
+                    move = rng.choice(options)
+            played.append((idx, move, state.apply(idx, move)))
+            if state.at_goal(idx):
+                winner = idx
+                break
+            idx = 1 - idx
+
+        if winner is None:
+            # Pure race from here: the side to move wins ties.
+            mine = state.goal_distance(idx)
+            theirs = state.goal_distance(1 - idx)
+            winner = idx if mine <= theirs else 1 - idx
+
+        for mover, move, token in reversed(played):
+            state.undo(mover, move, token)
+        return winner
+
+    def _rollout_wall(self, state, idx):
+        """A random legal wall across the opponent's shortest path, or None."""
+        cut_h, cut_v = state.path_cuts(1 - idx)
+        for _ in range(3):
+            orient = HORIZONTAL if self.rng.random() < 0.5 else VERTICAL
+            options = list(iter_bits(state.free_wall_slots(orient) & (cut_h if orient == HORIZONTAL else cut_v)))
+            if not options:
+                continue
+            slot = self.rng.choice(options)
+            if state.wall_keeps_paths(slot, orient):
+                return (TYPE_WALL, slot, orient)
+        return None
+
+    def _principal_variation(self, node):
+        pv = [node.move]
+        while node.children:
+            node = max(node.children, key=lambda c: c.visits)
+            pv.append(node.move)
+        return pv
+
+    def _search_root_parallel(self, state, idx):
+        """Independent trees per worker (root parallelism); visit counts are summed per root move."""
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.workers)
+        base = self.rng.getrandbits(32)
+        packed = state.pack()
+        tasks = [(self.config(), packed, idx, base + w) for w in range(self.workers)]
+
+        visits, wins = {}, {}
+        self.playouts = 0
+        self.nodes = 0
+        for stats, playouts, nodes in self._pool.map(_root_stats, tasks):
+            self.playouts += playouts
+            self.nodes += nodes
+            for move, (n, w) in stats.items():
+                visits[move] = visits.get(move, 0) + n
+                wins[move] = wins.get(move, 0) + w
+        if not visits:
+            return None
+        # Most visits wins; ties resolved by move order so the merge is deterministic.
+        best = max(sorted(visits), key=lambda m: visits[m])
+        self.best_value = wins[best] / visits[best]
+        self.pv = [best]
+        return best
+
+
+def _root_stats(task):
+    config, packed, idx, seed = task
+    engine = MCTSEngine(seed=seed, **config)
+    state = BitBoard.unpack(packed)
+    root = _Node(None, None, 1 - idx, state.hash)
+    engine._run(state, root)
+    stats = {c.move: (c.visits, c.wins) for c in root.children}
+    return stats, engine.playouts, engine.nodes
@@ -0,0 +1,12 @@
+from AIPlayer import AIPlayer
+from MCTSEngine import MCTSEngine
+
+
+class MCTSPlayer(AIPlayer):
+    """AI opponent backed by Monte Carlo tree search instead of alpha-beta."""
+    def __init__(self, *args, iterations=None, time_budget=2.0, exploration=1.4,
+                 rollouts_per_leaf=4, workers=1, **kwargs):
+        factory = lambda: MCTSEngine(iterations=iterations, time_budget=time_budget,
+                                     exploration=exploration, rollouts_per_leaf=rollouts_per_leaf,
+                                     workers=workers)
+        super().__init__(*args, book_path=None, engine_factory=factory, **kwargs)
@@ -0,0 +1,147 @@
+from Config import TYPE_PAWN, TYPE_WALL
+from BitBoard import BitBoard
+
+
+def cell_bits(size):
+    """Bits needed for a cell index on a size x size board (8 up to 15x15)."""
+    return max(8, (size * size - 1).bit_length())
+
+
+def encode(idx, move, from_cell, bits=8):
+    """Packs one ply into a small int: mover, kind, and either from/to cells or wall slot/orientation.
+
+    bits is the width of the from-cell field, cell_bits(size) for the board.
+    """
+    if move[0] == TYPE_PAWN:
+        return idx | (TYPE_PAWN << 1) | (from_cell << 2) | (move[1] << (2 + bits))
+    return idx | (TYPE_WALL << 1) | (move[2] << 2) | (move[1] << 4)
+
+
+def decode(code, bits=8):
+    """Returns (idx, move, from_cell); from_cell is None for walls."""
+    idx = code & 1
+    if (code >> 1) & 1 == TYPE_PAWN:
+        return idx, (TYPE_PAWN, code >> (2 + bits)), (code >> 2) & ((1 << bits) - 1)
+    return idx, (TYPE_WALL, code >> 4, (code >> 2) & 0b11), None
+
+
+class _Ply:
+    __slots__ = ("parent", "children", "code", "ply", "keyframe", "last")
+
+    def __init__(self, parent, code, ply, keyframe=None):
+        self.parent = parent
+        self.children = []
+        self.code = code
+        self.ply = ply
+        self.keyframe = keyframe    # BitBoard.pack() after this ply, every interval plies
+        self.last = None            # child redo follows (the most recently visited)
+
+
+class MoveLog:
+    """Game history as a tree of delta-encoded plies.
+
+    Each ply stores one int (see encode). Every `interval` plies a packed keyframe is kept,
+    so rebuilding any position replays at most interval - 1 deltas. Playing a different
+    move after an undo starts a new variation; the old line stays reachable.
+    """
+    def __init__(self, state, to_move=0, interval=16):
+        self.interval = interval
+        self.bits = cell_bits(state.size)
+        self.root = _Ply(None, None, 0, state.pack())
+        self.root_to_move = to_move
+        self.current = self.root
+
+    def to_move(self, node=None):
+        node = node or self.current
+        if node.code is None:
+            return self.root_to_move
+        return 1 - (node.code & 1)
+
+    def record(self, state, idx, move):
+        """Logs a move about to be applied to state (state must still be the position before it)."""
+        from_cell = state.pawns[idx] if move[0] == TYPE_PAWN else 0
+        code = encode(idx, move, from_cell, self.bits)
+        node = self.current
+        child = next((c for c in node.children if c.code == code), None)
+        if child is None:
+            ply = node.ply + 1
+            child = _Ply(node, code, ply)
+            node.children.append(child)
+            if ply % self.interval == 0:
+                after = state.copy()
+                after.apply(idx, move)
+                child.keyframe = after.pack()
+        node.last = child
+        self.current = child
+
+    def can_undo(self):
+        return self.current.parent is not None
+
+    def can_redo(self, variation=None):
+        if variation is None:
+            return self.current.last is not None
+        return 0 <= variation < len(self.current.children)
+
+    def undo(self, state):
+        """Takes back the current ply in place on state."""
+        node = self.current
+        idx, move, from_cell = decode(node.code, self.bits)
+        if move[0] == TYPE_PAWN:
+            state.move_pawn(idx, from_cell)
+        else:
+            state.remove_wall(move[1], move[2], idx)
+        node.parent.last = node
+        self.current = node.parent
+
+    def redo(self, state, variation=None):
+        """Replays the next ply in place. variation picks a child index instead of the last one visited."""
+        node = self.current
+        child = node.last if variation is None else node.children[variation]
+        idx, move, _ = decode(child.code, self.bits)
+        state.apply(idx, move)
+        node.last = child
+        self.current = child
+
+    def variations(self):
+        """Moves played from the current position, as (idx, move) pairs in creation order."""
+        return [decode(c.code, self.bits)[:2] for c in self.current.children]
+
+    def line(self):
+        """The current line from the start to its last ply, following redo pointers past the current ply."""
+        nodes = []
+        node = self.current
+        while node.parent is not None:
+            nodes.append(node)
+            node = node.parent
+        nodes.reverse()
+        node = self.current
+        while node.last is not None:
+            node = node.last
+            nodes.append(node)
+        return nodes
+
+    def moves(self):
+        """(idx, move) pairs along the current line."""
+        return [decode(n.code, self.bits)[:2] for n in self.line()]
+
+    def seek(self, ply):
+        """Moves to ply on the current line and returns a fresh BitBoard for it.
+
+        Starts from the nearest keyframe at or before ply, so at most interval - 1 deltas are replayed.
+        """
+        line = [self.root] + self.line()
+        if not 0 <= ply < len(line):
+            raise IndexError(f"ply {ply} is not on the current line (0..{len(line) - 1})")
+        base = ply
+        while line[base].keyframe is None:
+            base -= 1
+        state = BitBoard.unpack(line[base].keyframe)
+        for node in line[base + 1:ply + 1]:
+            idx, move, _ = decode(node.code, self.bits)
+            state.apply(idx, move)
+        target = line[ply]
+        # Keep the rest of the line reachable by redo from the new position.
+        for a, b in zip(line, line[1:]):
+            a.last = b
+        self.current = target
+        return state
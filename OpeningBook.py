@@ -0,0 +1,175 @@
+"""Opening book: scored moves keyed by position hash, stored sorted on disk.
+
+    python OpeningBook.py --plies 4 --depth 4 --time 5     # build opening_book.qbk offline
+
+File layout: b"QOB1", board size (u32), entry count (u32), then fixed 12-byte entries
+(position key u64, move code u16, score i16) sorted by key, best score first within a key.
+The position key is the Zobrist hash with the side-to-move key mixed in for player 2, the
+same key the transposition table uses. Scores are the mover's search value times 100.
+Lookups memory-map the file on first use and binary-search it, so loading costs nothing.
+"""
+import argparse
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+
+from BitBoard import BitBoard
+from Config import TYPE_PAWN
+from GameRecord import decode_move, encode_move
+
+MAGIC = b"QOB1"
+_HEADER = struct.Struct("<4sII")
+_ENTRY = struct.Struct("<QHh")
+SCORE_LIMIT = 32000
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.qbk")
+
+
+def position_key(state, idx):
+    return state.hash ^ state.t.z_side if idx == 1 else state.hash
+
+
+def _score(value):
+    if math.isinf(value):
+        return SCORE_LIMIT if value > 0 else -SCORE_LIMIT
+    return max(-SCORE_LIMIT, min(SCORE_LIMIT, round(value * 100)))
+
+
+def score_value(score):
+    """Search value of a stored score; the caps stand for a forced win or loss."""
+    if abs(score) >= SCORE_LIMIT:
+        return math.inf if score > 0 else -math.inf
+    return score / 100
+
+
+class OpeningBook:
+    """Read-only view of a book file. A missing file behaves as an empty book."""
+    def __init__(self, path=BOOK_PATH):
+        self.path = path
+        self.size = None
+        self.count = 0
+        self.mm = None
+        self._file = None
+        self._opened = False
+        self.hits = 0
+
+    def _open(self):
+        self._opened = True
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < _HEADER.size:
+            return
+        self._file = open(self.path, "rb")
+        self.mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.size, self.count = _HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not an opening book")
+
+    def _key_at(self, i):
+        return _ENTRY.unpack_from(self.mm, _HEADER.size + i * _ENTRY.size)[0]
+
+    def probe(self, state, idx):
+        """Scored moves for player idx in state as [(move, score), ...], best first; [] if not in the book."""
+        if not self._opened:
+            self._open()
+        if self.mm is None or state.size != self.size:
+            return []
+        key = position_key(state, idx)
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        entries = []
+        while lo < self.count:
+            k, code, score = _ENTRY.unpack_from(self.mm, _HEADER.size + lo * _ENTRY.size)
+            if k != key:
+                break
+            entries.append((decode_move(code, self.size), score))
+            lo += 1
+        if entries:
+            self.hits += 1
+        return entries
+
+    def close(self):
+        if self.mm is not None:
+            self.mm.close()
+            self._file.close()
+        self.mm = None
+        self._file = None
+        self.count = 0
+
+
+def write_book(path, entries, size=9):
+    """entries maps position key -> {move: score}; writes them sorted in the book format."""
+    rows = sorted((key, -score, encode_move(move, size))
+                  for key, moves in entries.items() for move, score in moves.items())
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, size, len(rows)))
+        for key, neg_score, code in rows:
+            f.write(_ENTRY.pack(key, code, -neg_score))
+    return len(rows)
+
+
+def build(plies=4, depth=4, time_budget=None, node_budget=None, size=9, out=sys.stdout):
+    """Searches every position reachable in `plies` plies through book lines and returns the entries.
+
+    From each position the engine's best move and every other pawn move are followed. Each
+    followed move is scored by a search from the same position restricted to that move, so
+    every score is the mover's own value at the engine's depth, like the best move's.
+    """
+    from Rules import legal_moves
+    from SearchEngine import SearchEngine
+
+    engine = SearchEngine(search_depth=depth, time_budget=time_budget, node_budget=node_budget)
+    entries = {}
+    frontier = [(BitBoard(size), 0)]
+    for ply in range(plies):
+        next_frontier = []
+        t0 = time.perf_counter()
+        for state, idx in frontier:
+            key = position_key(state, idx)
+            if key in entries:
+                continue
+            engine.clear()
+            best = engine.search(state.copy(), idx)
+            if best is None:
+                continue
+            entries[key] = {best: _score(engine.best_value)}
+            if ply + 1 == plies:
+                continue
+            follow = [best] + [m for m in legal_moves(state, idx) if m[0] == TYPE_PAWN and m != best]
+            for move in follow:
+                if move != best:
+                    engine.clear()
+                    engine.search(state.copy(), idx, [move])
+                    entries[key][move] = _score(engine.best_value)
+                child = state.copy()
+                child.apply(idx, move)
+                if not child.at_goal(idx):
+                    next_frontier.append((child, 1 - idx))
+        out.write(f"ply {ply}: {len(frontier)} positions, {len(entries)} in book, "
+                  f"{time.perf_counter() - t0:.1f}s\n")
+        frontier = next_frontier
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the opening book from deep searches.")
+    parser.add_argument("--plies", type=int, default=4, help="how many plies from the start to cover")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--time", type=float, default=None, help="seconds per position")
+    parser.add_argument("--nodes", type=int, default=None, help="node budget per position")
+    parser.add_argument("--output", default=BOOK_PATH)
+    args = parser.parse_args(argv)
+    entries = build(args.plies, args.depth, args.time, args.nodes)
+    n = write_book(args.output, entries)
+    print(f"wrote {n} moves for {len(entries)} positions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
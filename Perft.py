@@ -0,0 +1,230 @@
+"""Perft: counts leaf positions to a fixed depth to measure and cross-check move generation.
+
+    python Perft.py --depth 2            # counts and nodes/sec per reference position
+    python Perft.py --depth 2 --check    # compare with perft_fixtures.json and check generators agree
+    python Perft.py --depth 3 --freeze   # rewrite the fixtures (only after a deliberate rules change)
+
+Counts come from the production generator, Rules.legal_moves, and are split by the kind
+of move that reached the leaf: plain step, straight jump, diagonal side-step or wall. A
+move that wins the game is a leaf at any depth. rules_pawn_moves below is an independent
+oracle that --check compares the shared generator and the human input path against.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+from BitBoard import BitBoard, DIRECTIONS, UP, DOWN, LEFT, RIGHT
+from Config import TYPE_PAWN, TYPE_WALL, HORIZONTAL, VERTICAL
+from Rules import legal_moves
+from WallBatch import evaluate_walls
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perft_fixtures.json")
+
+KINDS = ("step", "jump", "diagonal", "wall")
+
+# Pawns as (row, col) on the 9x9 board, walls as (slot row, slot col, "h"/"v").
+REFERENCE_POSITIONS = [
+    {"name": "start", "pawns": [(8, 4), (0, 4)], "walls_left": [10, 10], "walls": [], "to_move": 0},
+    {"name": "face-to-face", "pawns": [(4, 4), (3, 4)], "walls_left": [10, 10], "walls": [], "to_move": 0},
+    {"name": "jump-blocked", "pawns": [(4, 4), (3, 4)], "walls_left": [9, 10],
+     "walls": [(2, 4, "h")], "to_move": 0},
+    {"name": "midgame", "pawns": [(5, 3), (3, 5)], "walls_left": [6, 7],
+     "walls": [(4, 3, "h"), (4, 5, "h"), (2, 2, "v"), (6, 1, "v"), (1, 6, "h"), (3, 6, "v"), (5, 4, "v")],
+     "to_move": 1},
+    {"name": "race", "pawns": [(2, 6), (1, 6)], "walls_left": [0, 0],
+     "walls": [(0, 5, "h"), (1, 3, "v"), (3, 6, "h")], "to_move": 0},
+]
+
+
+def build_position(spec):
+    state = BitBoard()
+    for y, x, kind in spec["walls"]:
+        slot = y * state.t.slot_dim + x
+        orient = HORIZONTAL if kind == "h" else VERTICAL
+        if not state.wall_fits(slot, orient):
+            raise ValueError(f"{spec['name']}: wall {(y, x, kind)} overlaps another")
+        state.place_wall(slot, orient)
+    state.move_pawn(0, state.cell(*spec["pawns"][0]))
+    state.move_pawn(1, state.cell(*spec["pawns"][1]))
+    state.set_walls_left(0, spec["walls_left"][0])
+    state.set_walls_left(1, spec["walls_left"][1])
+    return state, spec["to_move"]
+
+
+def rules_pawn_moves(state, idx):
+    """Pawn moves allowed by the rules, as (kind, destination cell) pairs.
+
+    Deliberately written out step by step rather than using Rules.pawn_moves, so the
+    shared generator has something independent to be checked against.
+    """
+    moves = []
+    pos = state.pawns[idx]
+    opp = state.pawns[1 - idx]
+    for d in DIRECTIONS:
+        n = state.step(pos, d)
+        if n < 0:
+            continue
+        if n != opp:
+            moves.append(("step", n))
+            continue
+        j = state.step(n, d)
+        if j >= 0:
+            moves.append(("jump", j))
+            continue
+        for side in ((LEFT, RIGHT) if d in (UP, DOWN) else (UP, DOWN)):
+            s = state.step(n, side)
+            if s >= 0 and ("diagonal", s) not in moves:
+                moves.append(("diagonal", s))
+    return moves
+
+
+def rules_moves(state, idx):
+    """Complete legal move list as (kind, move) pairs; move is in the engine's tuple format."""
+    moves = [(kind, (TYPE_PAWN, cell)) for kind, cell in rules_pawn_moves(state, idx)]
+    if state.walls_left[idx] > 0:
+        moves.extend(("wall", (TYPE_WALL, slot, orient)) for slot, orient in state.legal_walls())
+    return moves
+
+
+def move_kind(state, idx, move):
+    """"step", "jump", "diagonal" or "wall", read off the move's geometry."""
+    if move[0] != TYPE_PAWN:
+        return "wall"
+    (r0, c0), (r1, c1) = divmod(state.pawns[idx], state.size), divmod(move[1], state.size)
+    dr, dc = abs(r1 - r0), abs(c1 - c0)
+    if dr + dc == 1:
+        return "step"
+    return "jump" if dr == 0 or dc == 0 else "diagonal"
+
+
+def perft(state, idx, depth, counts):
+    """Number of leaves depth plies below state with idx to move; counts is filled per kind.
+
+    Walks Rules.legal_moves, the generator the engines and the GUI use.
+    """
+    moves = [(move_kind(state, idx, m), m) for m in legal_moves(state, idx)]
+    if depth == 1:
+        for kind, _ in moves:
+            counts[kind] += 1
+        return len(moves)
+
+    total = 0
+    for kind, move in moves:
+        token = state.apply(idx, move)
+        if state.at_goal(idx):
+            counts[kind] += 1
+            total += 1
+        else:
+            total += perft(state, 1 - idx, depth - 1, counts)
+        state.undo(idx, move, token)
+    return total
+
+
+def player_pawn_moves(state, idx):
+    """Destinations the human input path (Player.handle_move_request) accepts from state."""
+    from Board import Board
+
+    board = Board()
+    player = board.p1 if idx == 0 else board.p2
+    keys = ("top", "down", "left", "right", "topLeft", "topRight", "bottomLeft", "bottomRight")
+    dests = set()
+    for key in keys:
+        board.state = state.copy()
+        with contextlib.redirect_stdout(io.StringIO()):
+            if player.handle_move_request(key):
+                dests.add(player.cell)
+    return dests
+
+
+def generator_disagreements(state, idx, depth):
+    """Walks the tree above the leaf ply and compares each pawn generator with the rules.
+
+    Returns counts of positions where the human path or the shared generator in Rules differs
+    from rules_pawn_moves, and where the batched NumPy wall check disagrees with BitBoard.legal_walls.
+    """
+    report = {"positions": 0, "player": 0, "engine": 0, "batch": 0}
+
+    def walk(idx, depth):
+        rules = {cell for _, cell in rules_pawn_moves(state, idx)}
+        report["positions"] += 1
+        if player_pawn_moves(state, idx) != rules:
+            report["player"] += 1
+        if {m[1] for m in legal_moves(state, idx) if m[0] == TYPE_PAWN} != rules:
+            report["engine"] += 1
+        candidates, legal, _, _ = evaluate_walls(state)
+        if [w for w, ok in zip(candidates, legal) if ok] != state.legal_walls():
+            report["batch"] += 1
+        if depth <= 1:
+            return
+        for kind, move in rules_moves(state, idx):
+            if kind == "wall" and depth <= 2:
+                continue  # walls don't move pawns; one ply of them is enough coverage
+            token = state.apply(idx, move)
+            if not state.at_goal(idx):
+                walk(1 - idx, depth - 1)
+            state.undo(idx, move, token)
+
+    walk(idx, depth)
+    return report
+
+
+def run(depth, names=None, check=False, freeze=False, out=sys.stdout):
+    fixtures = {}
+    if check and os.path.exists(FIXTURES):
+        with open(FIXTURES) as f:
+            fixtures = json.load(f)
+
+    failures = 0
+    frozen = {}
+    for spec in REFERENCE_POSITIONS:
+        if names and spec["name"] not in names:
+            continue
+        state, idx = build_position(spec)
+        frozen[spec["name"]] = {}
+        for d in range(1, depth + 1):
+            counts = dict.fromkeys(KINDS, 0)
+            t0 = time.perf_counter()
+            nodes = perft(state, idx, d, counts)
+            secs = time.perf_counter() - t0
+            frozen[spec["name"]][str(d)] = dict(counts, nodes=nodes)
+            line = (f"{spec['name']:<14} depth {d}: {nodes:>10} nodes  "
+                    + "  ".join(f"{k} {counts[k]}" for k in KINDS)
+                    + f"  {nodes / secs if secs else 0:,.0f} nodes/sec")
+
+            expected = fixtures.get(spec["name"], {}).get(str(d))
+            if check and expected is not None and expected != frozen[spec["name"]][str(d)]:
+                line += f"  MISMATCH (expected {expected})"
+                failures += 1
+            out.write(line + "\n")
+
+        if check:
+            report = generator_disagreements(state, idx, min(depth, 2))
+            out.write(f"{spec['name']:<14} generators: {report['positions']} positions, "
+                      f"player differs in {report['player']}, engine differs in {report['engine']}, "
+                      f"batch walls differ in {report['batch']}\n")
+            failures += report["player"] + report["engine"] + report["batch"]
+
+    if freeze:
+        with open(FIXTURES, "w") as f:
+            json.dump(frozen, f, indent=2, sort_keys=True)
+            f.write("\n")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move-generation perft counts and benchmark.")
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--position", action="append", help="only run the named reference position(s)")
+    parser.add_argument("--check", action="store_true", help="compare with the frozen fixtures")
+    parser.add_argument("--freeze", action="store_true", help="write the counts as the new fixtures")
+    args = parser.parse_args(argv)
+    failures = run(args.depth, args.position, args.check, args.freeze)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""The move rules, shared by human input, the search engines and the tools.
+
+Board geometry is precomputed per board size: for every cell and direction, the
+neighbour, the square a straight jump lands on, and the two diagonal side-steps.
+Walls are then a single bit test against the state's passable-edge masks.
+"""
+from BitBoard import DIRECTIONS, UP, DOWN, LEFT, RIGHT
+from Config import TYPE_PAWN, TYPE_WALL
+
+_SIDES = {UP: (LEFT, RIGHT), DOWN: (LEFT, RIGHT), LEFT: (UP, DOWN), RIGHT: (UP, DOWN)}
+
+# Movement keys used by the GUI, as the directions they combine.
+KEYS = {
+    "top": (UP,), "down": (DOWN,), "left": (LEFT,), "right": (RIGHT,),
+    "topLeft": (UP, LEFT), "topRight": (UP, RIGHT),
+    "bottomLeft": (DOWN, LEFT), "bottomRight": (DOWN, RIGHT),
+}
+
+_TABLES = {}
+
+
+def _tables(size):
+    """(neighbours, steps): neighbours[cell][d] is the adjacent cell or -1 off the board;
+    steps[cell] lists (d, neighbour, ((side, side-step cell), ...)) for every on-board direction.
+    """
+    tables = _TABLES.get(size)
+    if tables is None:
+        offsets = {UP: (-1, 0), DOWN: (1, 0), LEFT: (0, -1), RIGHT: (0, 1)}
+        neighbours = []
+        for cell in range(size * size):
+            r, c = divmod(cell, size)
+            row = []
+            for d in DIRECTIONS:
+                nr, nc = r + offsets[d][0], c + offsets[d][1]
+                row.append(nr * size + nc if 0 <= nr < size and 0 <= nc < size else -1)
+            neighbours.append(tuple(row))
+        steps = []
+        for cell in range(size * size):
+            out = []
+            for d in DIRECTIONS:
+                n = neighbours[cell][d]
+                if n < 0:
+                    continue
+                sides = tuple((s, neighbours[n][s]) for s in _SIDES[d] if neighbours[n][s] >= 0)
+                out.append((d, n, sides))
+            steps.append(tuple(out))
+        tables = _TABLES[size] = (neighbours, steps)
+    return tables
+
+
+def pawn_moves(state, idx):
+    """Every legal pawn move for idx: steps, straight jumps over the opponent, and the
+    diagonal side-steps allowed when such a jump is blocked by a wall or the board edge.
+    """
+    open_ = state.open
+    neighbours, steps = _tables(state.size)
+    pos = state.pawns[idx]
+    opp = state.pawns[1 - idx]
+    moves = []
+    for d, n, sides in steps[pos]:
+        if not open_[d] >> pos & 1:
+            continue
+        if n != opp:
+            moves.append((TYPE_PAWN, n))
+        elif open_[d] >> n & 1:
+            moves.append((TYPE_PAWN, neighbours[n][d]))
+        else:
+            for s, dest in sides:
+                if open_[s] >> n & 1:
+                    moves.append((TYPE_PAWN, dest))
+    return moves
+
+
+def wall_moves(state, idx, selective=False):
+    """Walls player idx may place: they must fit and keep both goals reachable.
+
+    With selective set, only walls near either pawn or across the opponent's shortest
+    path are generated.
+    """
+    if state.walls_left[idx] <= 0:
+        return []
+    masks = None
+    if selective:
+        near = state.t.near_slots[state.pawns[idx]] | state.t.near_slots[state.pawns[1 - idx]]
+        cut_h, cut_v = state.path_cuts(1 - idx)
+        masks = (near | cut_h, near | cut_v)
+    return [(TYPE_WALL, slot, orient) for slot, orient in state.legal_walls(masks)]
+
+
+def legal_moves(state, idx, selective=False):
+    """The complete move list for player idx: pawn moves, then walls."""
+    return pawn_moves(state, idx) + wall_moves(state, idx, selective)
+
+
+def key_destination(state, idx, key):
+    """The cell a movement key points at for idx, or -1.
+
+    A straight key pointing at the opponent means the jump behind it; a diagonal key is
+    the diagonal cell. Whether the move is legal is up to pawn_moves.
+    """
+    dirs = KEYS.get(key)
+    if dirs is None:
+        return -1
+    neighbours, _ = _tables(state.size)
+    cell = state.pawns[idx]
+    if len(dirs) == 1:
+        n = neighbours[cell][dirs[0]]
+        if n >= 0 and n == state.pawns[1 - idx]:
+            n = neighbours[n][dirs[0]]
+        return n
+    n = neighbours[cell][dirs[0]]
+    return neighbours[n][dirs[1]] if n >= 0 else -1
+
+
+def is_legal_pawn_move(state, idx, cell):
+    return cell >= 0 and (TYPE_PAWN, cell) in pawn_moves(state, idx)
@@ -0,0 +1,658 @@
+from Config import TYPE_PAWN, TYPE_WALL, HORIZONTAL, VERTICAL
+from BitBoard import BitBoard, UNREACHABLE, iter_bits
+from Rules import pawn_moves, wall_moves, legal_moves
+from GameRecord import move_to_text, to_text
+from SearchStats import SearchStats, write_trace
+from EndgameSolver import EndgameSolver, UNKNOWN, WIN, LOSS
+from OpeningBook import score_value
+from WallBatch import evaluate_walls
+from TranspositionTable import TranspositionTable, EXACT, LOWER, UPPER
+import math
+import multiprocessing
+import time
+
+# Largest board searched full-width by default; bigger boards only consider walls near
+# the pawns or across a shortest path below the root, which keeps the branching factor
+# growing with the side length instead of its square.
+FULL_WIDTH_MAX_SIZE = 9
+
+# Scores are path lengths plus walls in hand times the wall weight. The weight must be a
+# multiple of 1 / SCORE_GRID, so every score lies on that grid, is exact in floating point,
+# and two different scores are always further apart than the width of a null window.
+SCORE_GRID = 1024
+NULL_WINDOW = 1e-6
+# Half-width of the aspiration window around the previous iteration's score, in steps.
+ASPIRATION = 1.0
+# Plies of wall-only search past the horizon (0 turns it off), and how many steps of the
+# opponent's shortest path its walls may block.
+QUIESCENCE_PLIES = 1
+QUIESCENCE_STEPS = 2
+
+
+class SearchAborted(Exception):
+    """Raised inside the search when the time or node budget runs out."""
+
+
+class SearchEngine:
+    """Alpha-beta search over a BitBoard, independent of Board and the GUI.
+
+    Scores are from the point of view of the player the search was started for
+    (the root side): +inf means that player wins. selective=None picks selective wall
+    generation by board size (see FULL_WIDTH_MAX_SIZE).
+    """
+    def __init__(self, search_depth=8, wall_bonus_weight=1.5, tt_size_mb=16,
+                 time_budget=2.0, node_budget=None, workers=1, selective=None, book=None,
+                 endgame=True, trace_path=None, quiescence=True):
+        if (wall_bonus_weight * SCORE_GRID) % 1:
+            raise ValueError(f"wall_bonus_weight must be a multiple of 1/{SCORE_GRID}, got {wall_bonus_weight}")
+        self.depth = search_depth
+        self.wall_weight = wall_bonus_weight
+        self.tt_size_mb = tt_size_mb
+        self.tt = TranspositionTable(tt_size_mb)
+
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.workers = workers
+        self.selective = selective
+        self._selective = bool(selective)
+        self.book = book
+        self.endgame = EndgameSolver() if endgame else None
+        self.quiescence = quiescence
+        self.time_bank = 0.0
+        self.should_stop = None     # optional callable polled with the budget, for outside cancellation
+        self.pondered = {}          # (hash, idx) -> finished answer found while pondering
+        self.trace_path = trace_path    # JSON lines file that gets one record per search
+        self.stats = SearchStats()
+        self.on_iteration = None    # optional callable(engine) after every completed iteration
+        self._pondering = False
+        self.killers = []
+        self.history = {}
+        self.nodes = 0
+        self.completed_depth = 0
+        self.best_value = 0
+        self.pv = []
+        self.me = 1
+        self.opp = 0
+        self._deadline = None
+        self._enforce_budget = False
+        self._pool = None
+        self._shared_alpha = None
+
+    def config(self):
+        """Constructor arguments, used to build identical engines in worker processes."""
+        return {
+            "search_depth": self.depth,
+            "wall_bonus_weight": self.wall_weight,
+            "tt_size_mb": self.tt_size_mb,
+            "time_budget": self.time_budget,
+            "node_budget": self.node_budget,
+            "selective": self.selective,
+            "endgame": self.endgame is not None,
+            "trace_path": self.trace_path,
+            "quiescence": self.quiescence,
+        }
+
+    def clear(self):
+        """Forgets everything learned so far (called when the game is rewound)."""
+        self.tt.clear()
+        self.history = {}
+        self.pondered = {}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+
+    def set_root(self, idx, state=None):
+        """Searches from now on are for player idx. The table is kept: its keys include the root side."""
+        self.me, self.opp = idx, 1 - idx
+        if state is not None:
+            self._selective = self.selective if self.selective is not None else state.size > FULL_WIDTH_MAX_SIZE
+
+    def search(self, state, idx, moves=None):
+        """Best move for player idx in state. state is used as scratch space and restored.
+
+        moves, if given, restricts the root to those moves; best_value is then the value of
+        the best of them. Afterwards self.stats describes the search; with trace_path set
+        it is also appended to that file.
+        """
+        self.stats.reset()
+        move = self._search(state, idx, moves)
+        self.stats.finish(self.nodes)
+        if self.trace_path and not self._pondering:
+            self._write_trace(state, idx, move)
+        return move
+
+    def _search(self, state, idx, moves=None):
+        self.set_root(idx, state)
+        stats = self.stats
+        pondered = self.pondered.get((state.hash, idx))
+        self.pondered = {}
+        if pondered is not None and moves is None:
+            move, self.best_value, self.completed_depth, self.pv = pondered
+            self.nodes = 0
+            stats.source = "ponder"
+            return move
+
+        valid_moves = self._get_moves(state, is_max=True)
+        if moves is not None:
+            valid_moves = [m for m in valid_moves if m in moves]
+
+        for m in valid_moves:
+            if m[0] == TYPE_PAWN and state.row(m[1]) == state.goal_rows[idx]:
+                self.best_value = math.inf
+                self.pv = [m]
+                self.nodes = 0
+                stats.source = "win"
+                return m
+
+        if self.endgame is not None and self.endgame.applies(state) and moves is None:
+            stats.source = "endgame"
+            return self._endgame_move(state, idx)
+
+        book_move = self._book_move(state, idx, valid_moves) if moves is None else None
+        if book_move is not None:
+            stats.source = "book"
+            return book_move
+
+        if state.walls_left[idx]:
+            self._presort_root(state, valid_moves, idx)
+        return self._iterative_deepening(state, valid_moves)
+
+    def ponder(self, state, idx):
+        """Thinks on the opponent's time. state is the position right after our own move.
+
+        Searches our answer to each likely reply in turn, with the normal per-move limits,
+        until should_stop() reports that the real reply has arrived. Answers that finished
+        are kept for search(); the table entries help whichever reply is actually played.
+        """
+        opp = 1 - idx
+        predicted = self.pv[1] if len(self.pv) > 1 else None
+        bank = self.time_bank
+        done = {}
+        self._pondering = True
+        for reply in self._likely_replies(state, opp, predicted):
+            if self.should_stop is not None and self.should_stop():
+                break
+            token = state.apply(opp, reply)
+            if not state.at_goal(opp):
+                move = self.search(state, idx)
+                if self.should_stop is None or not self.should_stop():
+                    done[(state.hash, idx)] = (move, self.best_value, self.completed_depth, self.pv)
+            state.undo(opp, reply, token)
+        self._pondering = False
+        self.time_bank = bank
+        self.pondered = done
+
+    def _write_trace(self, state, idx, move):
+        size = state.size
+        write_trace(self.trace_path, {
+            "position": state.pack(),
+            "side": idx,
+            "move": move_to_text(move, size) if move is not None else None,
+            "value": self.best_value if not math.isinf(self.best_value) else str(self.best_value),
+            "pv": to_text(self.pv, size),
+            "stats": self.stats.summary(),
+        })
+
+    def _likely_replies(self, state, opp, predicted=None):
+        """The predicted reply, pawn moves along the opponent's shortest path, the walls that hurt
+        us most relative to them, then the remaining pawn moves.
+        """
+        field = state.fields[opp]
+        here = field[state.pawns[opp]]
+        pawns = sorted(pawn_moves(state, opp), key=lambda m: field[m[1]])
+        replies = [m for m in pawns if field[m[1]] < here]
+        if state.walls_left[opp]:
+            candidates, legal, d0, d1 = evaluate_walls(state)
+            mine, theirs = (d1, d0) if opp == 0 else (d0, d1)
+            scored = sorted((int(theirs[i] - mine[i]), (TYPE_WALL,) + candidates[i])
+                            for i in range(len(candidates)) if legal[i])
+            replies += [m for _, m in scored[:3]]
+        replies += [m for m in pawns if field[m[1]] >= here]
+        if predicted is not None and predicted in legal_moves(state, opp):
+            replies = [predicted] + [m for m in replies if m != predicted]
+        return replies
+
+    def _endgame_move(self, state, idx):
+        """Exact move once both players are out of walls; no search needed."""
+        result, _ = self.endgame.lookup(state, idx)
+        self.nodes = 0
+        self.completed_depth = 0
+        self.best_value = math.inf if result == WIN else -math.inf if result == LOSS else 0
+        self.pv = self.endgame.principal_variation(state, idx)
+        return self.pv[0] if self.pv else None
+
+    def _book_move(self, state, idx, valid_moves):
+        """Highest-scored legal book move, or None. The time it saves is banked for later searches."""
+        if self.book is None:
+            return None
+        for move, score in self.book.probe(state, idx):
+            if move in valid_moves:
+                self.nodes = 0
+                self.completed_depth = 0
+                self.best_value = score_value(score)
+                self.pv = [move]
+                self.time_bank += self.time_budget or 0.0
+                return move
+        return None
+
+    def _presort_root(self, state, moves, idx):
+        """Pawn moves first, then walls by how much more they lengthen the opponent's path than ours.
+
+        All wall deltas come from one batched NumPy evaluation.
+        """
+        candidates, legal, d0, d1 = evaluate_walls(state)
+        gain = {}
+        for (slot, orient), ok, a, b in zip(candidates, legal, d0, d1):
+            if ok:
+                gain[(TYPE_WALL, slot, orient)] = int(b - a) if idx == 0 else int(a - b)
+        moves.sort(key=lambda m: (m[0] != TYPE_PAWN, -gain.get(m, 0)))
+
+    def _iterative_deepening(self, state, moves):
+        """Searches depth 0, 1, 2... below the root until the budget runs out.
+
+        Only completed iterations count: the move returned is the best move of the
+        deepest iteration that finished. The first iteration always runs to completion.
+        After it, each iteration first searches a window of ASPIRATION around the last
+        score and only repeats with a full window if the score falls outside it.
+        """
+        self.nodes = 0
+        self.completed_depth = 0
+        self.pv = []
+        self._deadline = None
+        if self.time_budget:
+            extra = min(self.time_bank, self.time_budget)
+            self.time_bank -= extra
+            self._deadline = time.perf_counter() + self.time_budget + extra
+        self._enforce_budget = False
+        self._new_search()
+
+        search_root = self._search_root if self.workers <= 1 else self._search_root_parallel
+
+        best_move = None
+        scores = {}
+        for depth in range(self.depth + 1):
+            # Previous best first, then the rest by their last scores.
+            moves.sort(key=lambda m: (m != best_move, -scores.get(m, -math.inf)))
+            try:
+                if best_move is not None and self.workers <= 1 and not math.isinf(self.best_value):
+                    alpha, beta = self.best_value - ASPIRATION, self.best_value + ASPIRATION
+                    iter_move, iter_val, scores = search_root(state, moves, depth, alpha, beta)
+                    if not alpha < iter_val < beta:
+                        self.stats.aspiration_misses += 1
+                        iter_move, iter_val, scores = search_root(state, moves, depth)
+                else:
+                    iter_move, iter_val, scores = search_root(state, moves, depth)
+            except SearchAborted:
+                break
+            best_move, self.best_value = iter_move, iter_val
+            self.completed_depth = depth + 1
+            self.pv = self._extract_pv(state, best_move)
+            self._enforce_budget = True
+            self.stats.iteration(self.completed_depth, self.nodes)
+            if self.on_iteration is not None:
+                self.on_iteration(self)
+
+            if abs(iter_val) == math.inf or self._budget_spent():
+                break
+        return best_move
+
+    def _new_search(self):
+        """Fresh killer slots per search; history is kept between moves but decayed."""
+        self.killers = [[None, None] for _ in range(self.depth + 2)]
+        for k in self.history:
+            self.history[k] //= 2
+
+    def _search_root(self, state, moves, depth, alpha=-math.inf, beta=math.inf):
+        """Principal variation search over the root moves inside (alpha, beta).
+
+        The first move gets the full window. Every later move is first tested with a
+        null window just above the best score so far and is searched again in full only
+        if it beats it. scores holds exact values for re-searched moves and upper bounds
+        for the rest, which is all the next iteration's ordering needs.
+        """
+        best_val = -math.inf
+        best_move = None
+        scores = {}
+
+        for move in moves:
+            token = state.apply(self.me, move)
+            try:
+                lo = max(alpha, best_val)
+                if best_move is None or lo == -math.inf:
+                    val = self._minimax(state, depth, lo, beta, False, 1)
+                else:
+                    val = self._minimax(state, depth, lo, lo + NULL_WINDOW, False, 1)
+                    if lo < val < beta:
+                        self.stats.researches += 1
+                        val = self._minimax(state, depth, lo, beta, False, 1)
+            finally:
+                state.undo(self.me, move, token)
+            scores[move] = val
+            if val > best_val or best_move is None:
+                best_val = val
+                best_move = move
+            if best_val >= beta:
+                break
+
+        return best_move, best_val, scores
+
+    def _search_root_parallel(self, state, moves, depth):
+        """Root split over a process pool with a shared alpha.
+
+        Each worker opens its window just below the best score found so far by any
+        worker, so moves that cannot beat it fail low cheaply. Only moves that scored
+        inside their window count as exact; the best of those wins and ties go to the
+        earliest move in root order, which keeps the result independent of timing.
+        """
+        pool = self._get_pool()
+        self._shared_alpha.value = -math.inf
+        deadline = None
+        if self._enforce_budget and self._deadline is not None:
+            deadline = time.time() + (self._deadline - time.perf_counter())
+        packed = state.pack()
+        tasks = [(packed, self.me, move, depth, deadline) for move in moves]
+
+        best_val = -math.inf
+        best_move = None
+        scores = {}
+        for move, result in zip(moves, pool.map(_search_root_move, tasks)):
+            if result is None:
+                raise SearchAborted()
+            val, exact, nodes = result
+            self.nodes += nodes
+            scores[move] = val if exact else -math.inf
+            if exact and (val > best_val or best_move is None):
+                best_val = val
+                best_move = move
+
+        if best_move is None:
+            best_move = moves[0]
+        return best_move, best_val, scores
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._shared_alpha = multiprocessing.Value("d", -math.inf)
+            self._pool = multiprocessing.Pool(
+                self.workers, initializer=_init_worker, initargs=(self.config(), self._shared_alpha))
+        return self._pool
+
+    def _budget_spent(self):
+        if self.should_stop is not None and self.should_stop():
+            return True
+        if self.node_budget is not None and self.nodes >= self.node_budget:
+            return True
+        return self._deadline is not None and time.perf_counter() >= self._deadline
+
+    def _extract_pv(self, state, first_move):
+        """Follows best moves stored in the transposition table from the root, at most
+        completed_depth moves in all.
+        """
+        pv = [first_move]
+        played = [(self.me, first_move, state.apply(self.me, first_move))]
+        is_max = False
+        for _ in range(self.completed_depth - 1):
+            if state.at_goal(0) or state.at_goal(1):
+                break
+            entry = self.tt.probe(self._tt_key(state, is_max))
+            if entry is None or entry[4] is None:
+                break
+            idx = self.me if is_max else self.opp
+            pv.append(entry[4])
+            played.append((idx, entry[4], state.apply(idx, entry[4])))
+            is_max = not is_max
+        for idx, move, token in reversed(played):
+            state.undo(idx, move, token)
+        return pv
+
+    def _tt_key(self, state, is_max):
+        """Position hash plus side to move and root side, since stored scores are the root side's."""
+        t = state.t
+        mover = self.me if is_max else self.opp
+        key = state.hash ^ t.z_side if mover == 1 else state.hash
+        return key ^ t.z_root if self.me == 1 else key
+
+    def _minimax(self, state, depth, alpha, beta, is_max, ply):
+        self.nodes += 1
+        if self._enforce_budget and self.nodes & 127 == 0 and self._budget_spent():
+            raise SearchAborted()
+
+        if state.at_goal(self.opp): return -math.inf
+        if state.at_goal(self.me): return math.inf
+
+        if self.endgame is not None and self.endgame.applies(state):
+            # Exact once walls are gone, if this layout has been solved already.
+            known = self.endgame.lookup(state, self.me if is_max else self.opp, solve=False)
+            if known is not None and known[0] != UNKNOWN:
+                won = (known[0] == WIN) == is_max
+                return math.inf if won else -math.inf
+
+        if depth == 0:
+            if self.quiescence and QUIESCENCE_PLIES:
+                return self._quiesce(state, alpha, beta, is_max, QUIESCENCE_PLIES)
+            return self._evaluate(state)
+
+        key = self._tt_key(state, is_max)
+        alpha_orig, beta_orig = alpha, beta
+        tt_move = None
+        entry = self.tt.probe(key)
+        if entry is not None:
+            _, e_depth, flag, value, tt_move = entry
+            if e_depth >= depth:
+                if flag == EXACT: return value
+                if flag == LOWER: alpha = max(alpha, value)
+                elif flag == UPPER: beta = min(beta, value)
+                if beta <= alpha: return value
+
+        moves = self._get_moves(state, is_max, self._selective)
+        self._order_moves(state, moves, is_max, tt_move, ply)
+        self.stats.interior += 1
+
+        best = -math.inf if is_max else math.inf
+        best_move = None
+        mover = self.me if is_max else self.opp
+        for i, move in enumerate(moves):
+            token = state.apply(mover, move)
+            try:
+                if i == 0:
+                    eval = self._minimax(state, depth - 1, alpha, beta, not is_max, ply + 1)
+                elif is_max and alpha > -math.inf:
+                    # Null window: only find out whether this move beats alpha.
+                    eval = self._minimax(state, depth - 1, alpha, alpha + NULL_WINDOW, False, ply + 1)
+                    if alpha < eval < beta:
+                        self.stats.researches += 1
+                        eval = self._minimax(state, depth - 1, alpha, beta, False, ply + 1)
+                elif not is_max and beta < math.inf:
+                    eval = self._minimax(state, depth - 1, beta - NULL_WINDOW, beta, True, ply + 1)
+                    if alpha < eval < beta:
+                        self.stats.researches += 1
+                        eval = self._minimax(state, depth - 1, alpha, beta, True, ply + 1)
+                else:
+                    eval = self._minimax(state, depth - 1, alpha, beta, not is_max, ply + 1)
+            finally:
+                # Also on SearchAborted, so the caller's state comes back intact.
+                state.undo(mover, move, token)
+            if is_max:
+                if eval > best or best_move is None:
+                    best, best_move = eval, move
+                alpha = max(alpha, eval)
+            else:
+                if eval < best or best_move is None:
+                    best, best_move = eval, move
+                beta = min(beta, eval)
+            if beta <= alpha:
+                self._record_cutoff(move, depth, ply)
+                self.stats.cutoff(i)
+                break
+
+        if best <= alpha_orig: flag = UPPER
+        elif best >= beta_orig: flag = LOWER
+        else: flag = EXACT
+        self.tt.store(key, depth, flag, best, best_move)
+        return best
+
+    def _evaluate(self, state):
+        t0 = time.perf_counter()
+        value = self._heuristic(state)
+        self.stats.eval += time.perf_counter() - t0
+        return value
+
+    def _quiesce(self, state, alpha, beta, is_max, plies):
+        """Static score at the horizon, unless the side to move has a wall that lengthens the
+        opponent's shortest path: then the best of standing pat and placing such a wall.
+
+        Only walls across the opponent's next QUIESCENCE_STEPS steps are tried, so a wall
+        dropped right in front of a pawn is never missed just because it lies past the horizon.
+        """
+        stand = self._evaluate(state)
+        mover = self.me if is_max else self.opp
+        opp = 1 - mover
+        if plies == 0 or not state.walls_left[mover]:
+            return stand
+        if is_max:
+            if stand >= beta:
+                return stand
+            alpha = max(alpha, stand)
+        else:
+            if stand <= alpha:
+                return stand
+            beta = min(beta, stand)
+
+        best = stand
+        before = state.goal_distance(opp)
+        for move in self._threat_walls(state, opp):
+            token = state.apply(mover, move)
+            try:
+                after = state.goal_distance(opp)
+                # Skip walls that do not hurt, and illegal ones that cut a player off.
+                if after <= before or after >= UNREACHABLE or state.goal_distance(mover) >= UNREACHABLE:
+                    continue
+                self.stats.quiescence += 1
+                val = self._quiesce(state, alpha, beta, not is_max, plies - 1)
+            finally:
+                state.undo(mover, move, token)
+            if is_max:
+                best = max(best, val)
+                alpha = max(alpha, val)
+            else:
+                best = min(best, val)
+                beta = min(beta, val)
+            if beta <= alpha:
+                break
+        return best
+
+    def _threat_walls(self, state, opp):
+        """Walls that fit across one of the first QUIESCENCE_STEPS steps of opp's shortest path.
+
+        Whether they keep both goals reachable is left to the caller.
+        """
+        path = state.shortest_path(opp)
+        if path is None:
+            return []
+        t = state.t
+        h = v = 0
+        for a, b in zip(path, path[1:QUIESCENCE_STEPS + 1]):
+            d = t.step_dir[b - a]
+            h |= t.cut_h[d][a]
+            v |= t.cut_v[d][a]
+        walls = [(TYPE_WALL, slot, HORIZONTAL) for slot in iter_bits(h & state.free_wall_slots(HORIZONTAL))]
+        walls += [(TYPE_WALL, slot, VERTICAL) for slot in iter_bits(v & state.free_wall_slots(VERTICAL))]
+        return walls
+
+    def _order_moves(self, state, moves, is_max, tt_move, ply):
+        """Table move, then pawn steps down the shortest path, killers, other steps,
+        walls across the opponent's shortest path, and the remaining walls by history score.
+        """
+        mover = self.me if is_max else self.opp
+        field = state.fields[mover]
+        here = field[state.pawns[mover]]
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        history = self.history
+        cut_h, cut_v = state.path_cuts(1 - mover) if state.walls_left[mover] else (0, 0)
+
+        def key(m):
+            if m == tt_move:
+                return (0, 0)
+            if m[0] == TYPE_PAWN:
+                return (1, 0) if field[m[1]] < here else (3, field[m[1]])
+            if m in killers:
+                return (2, 0)
+            cut = cut_h if m[2] == HORIZONTAL else cut_v
+            return (4 if (cut >> m[1]) & 1 else 5, -history.get((m[1], m[2]), 0))
+
+        moves.sort(key=key)
+
+    def _record_cutoff(self, move, depth, ply):
+        if ply < len(self.killers):
+            slots = self.killers[ply]
+            if slots[0] != move:
+                slots[1] = slots[0]
+                slots[0] = move
+        if move[0] == TYPE_WALL:
+            k = (move[1], move[2])
+            self.history[k] = self.history.get(k, 0) + depth * depth
+
+    def _get_moves(self, state, is_max, selective=False):
+        """Generates all legal moves for the virtual state, timing pawn moves and walls separately."""
+        idx = self.me if is_max else self.opp
+        stats = self.stats
+        t0 = time.perf_counter()
+        moves = pawn_moves(state, idx)
+        t1 = time.perf_counter()
+        walls = wall_moves(state, idx, selective)
+        stats.movegen += t1 - t0
+        stats.legality += time.perf_counter() - t1
+        stats.walls_legal += len(walls)
+        return moves + walls
+
+    def _heuristic(self, state):
+        """Shortest-path race: opponent's remaining distance minus ours, plus a bonus per wall in hand."""
+        dist_me = state.goal_distance(self.me)
+        dist_opp = state.goal_distance(self.opp)
+
+        score = dist_opp - dist_me
+
+        score += state.walls_left[self.me] * self.wall_weight
+        return score
+
+
+# --- worker process side ---------------------------------------------
+
+_worker_engine = None
+_worker_alpha = None
+
+
+def _init_worker(config, shared_alpha):
+    global _worker_engine, _worker_alpha
+    _worker_engine = SearchEngine(**config)
+    _worker_alpha = shared_alpha
+
+
+def _search_root_move(task):
+    """Searches one root move in a worker. Returns (value, exact, nodes), or None if out of time."""
+    packed, idx, move, depth, deadline = task
+    engine = _worker_engine
+    state = BitBoard.unpack(packed)
+    engine.set_root(idx, state)
+    engine.nodes = 0
+    engine._new_search()
+    engine._deadline = None if deadline is None else time.perf_counter() + (deadline - time.time())
+    engine._enforce_budget = deadline is not None
+
+    alpha = _worker_alpha.value
+    # Just below the shared best, so a move that ties it still gets an exact score.
+    lower = alpha - 1e-9 if alpha > -math.inf else -math.inf
+
+    state.apply(idx, move)
+    try:
+        val = engine._minimax(state, depth, lower, math.inf, False, 1)
+    except SearchAborted:
+        return None
+
+    exact = val > lower
+    if exact:
+        with _worker_alpha.get_lock():
+            if val > _worker_alpha.value:
+                _worker_alpha.value = val
+    return val, exact, engine.nodes
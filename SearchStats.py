@@ -0,0 +1,86 @@
+import json
+import time
+
+from BitBoard import flood_count, wall_candidate_count
+
+
+class SearchStats:
+    """Counters and timings for one SearchEngine.search call.
+
+    Phase times are wall-clock seconds spent generating pawn moves (movegen), generating
+    walls with their path checks (legality) and scoring leaves (eval). cutoffs[i] counts
+    beta cutoffs made by the i-th move tried at a node; a well-ordered search has most of
+    them at index 0. Floods are breadth-first searches: path checks and distance fields.
+    With root workers, only the node count includes work done in the other processes.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.source = "search"      # search, ponder, book, endgame or win
+        self.started = time.perf_counter()
+        self.elapsed = None
+        self.nodes = 0
+        self.interior = 0           # nodes that generated moves
+        self.depth = 0
+        self.cutoffs = []
+        self.movegen = 0.0
+        self.legality = 0.0
+        self.eval = 0.0
+        self.walls_legal = 0
+        self.researches = 0         # null-window searches that had to be repeated with the full window
+        self.aspiration_misses = 0  # iterations whose score fell outside the aspiration window
+        self.quiescence = 0         # walls searched past the horizon
+        self.iterations = []        # (depth, nodes, seconds) per completed iteration
+        self._floods = flood_count()
+        self._candidates = wall_candidate_count()
+
+    def cutoff(self, index):
+        cutoffs = self.cutoffs
+        while len(cutoffs) <= index:
+            cutoffs.append(0)
+        cutoffs[index] += 1
+
+    def iteration(self, depth, nodes):
+        self.depth = depth
+        self.nodes = nodes
+        self.iterations.append((depth, nodes, round(time.perf_counter() - self.started, 4)))
+
+    def finish(self, nodes):
+        self.nodes = nodes
+        self.elapsed = time.perf_counter() - self.started
+
+    def summary(self):
+        """Plain dict of the figures so far; safe to send between processes or dump as JSON."""
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self.started
+        nodes = self.nodes
+        floods = flood_count() - self._floods
+        candidates = wall_candidate_count() - self._candidates
+        cuts = sum(self.cutoffs)
+        return {
+            "source": self.source,
+            "depth": self.depth,
+            "nodes": nodes,
+            "seconds": round(elapsed, 4),
+            "nodes_per_sec": round(nodes / elapsed) if elapsed > 0 else 0,
+            "floods": floods,
+            "floods_per_node": round(floods / nodes, 3) if nodes else 0.0,
+            "cutoff_rate": round(cuts / self.interior, 3) if self.interior else 0.0,
+            "first_move_cutoffs": round(self.cutoffs[0] / cuts, 3) if cuts else 0.0,
+            "cutoffs_by_index": list(self.cutoffs),
+            "walls_generated": candidates,
+            "walls_rejected": candidates - self.walls_legal,
+            "movegen_sec": round(self.movegen, 4),
+            "legality_sec": round(self.legality, 4),
+            "eval_sec": round(self.eval, 4),
+            "researches": self.researches,
+            "aspiration_misses": self.aspiration_misses,
+            "quiescence_nodes": self.quiescence,
+            "iterations": list(self.iterations),
+        }
+
+
+def write_trace(path, record):
+    """Appends one search as a JSON line."""
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
@@ -0,0 +1,200 @@
+"""Headless self-play: pits two SearchEngine configurations against each other.
+
+    python Tournament.py --games 200 --workers 8 --depth-a 2 --depth-b 1 --output results.jsonl
+
+Every finished game is written as one JSON line as soon as it completes, followed by a
+summary line with win/draw/loss rates, 95% confidence intervals and throughput.
+--archive also appends every game's moves to a binary game archive (see GameRecord).
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import random
+import sys
+import time
+
+from BitBoard import BitBoard
+from GameRecord import GameRecordWriter, to_text, from_text
+from Rules import legal_moves
+from SearchEngine import SearchEngine
+
+
+def play_game(config_a, config_b, a_first, seed, opening_plies=2, max_plies=200, size=9):
+    """Plays one game and returns a result dict. Engine A moves first when a_first is set.
+
+    The first opening_plies moves are random legal moves drawn from seed, so games
+    between identical engines still diverge.
+    """
+    rng = random.Random(seed)
+    engines = [SearchEngine(**config_a), SearchEngine(**config_b)]
+    if not a_first:
+        engines.reverse()
+    # engines[idx] plays player idx; "a" is whichever engine was built from config_a.
+    a_idx = 0 if a_first else 1
+
+    state = BitBoard(size)
+    stats = [{"moves": 0, "time": 0.0, "nodes": 0} for _ in range(2)]
+    winner = None
+    moves = []
+    idx = 0
+    for ply in range(max_plies):
+        if ply < opening_plies:
+            move = rng.choice(legal_moves(state, idx))
+        else:
+            t0 = time.perf_counter()
+            move = engines[idx].search(state, idx)
+            stats[idx]["time"] += time.perf_counter() - t0
+            stats[idx]["nodes"] += engines[idx].nodes
+            stats[idx]["moves"] += 1
+        if move is None:
+            winner = 1 - idx
+            break
+        state.apply(idx, move)
+        moves.append(move)
+        if state.at_goal(idx):
+            winner = idx
+            break
+        idx = 1 - idx
+
+    if winner is None:
+        result = "draw"
+    else:
+        result = "a" if winner == a_idx else "b"
+    return {
+        "seed": seed,
+        "a_first": a_first,
+        "result": result,
+        "plies": ply + 1,
+        "a": stats[a_idx],
+        "b": stats[1 - a_idx],
+        "winner": winner,
+        "size": size,
+        "moves": to_text(moves, size),
+    }
+
+
+def _play_game_task(task):
+    return play_game(*task)
+
+
+def wilson_interval(k, n, z=1.96):
+    if n == 0:
+        return 0.0, 1.0
+    p = k / n
+    centre = (p + z * z / (2 * n)) / (1 + z * z / n)
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def summarize(games, elapsed):
+    n = len(games)
+    wins = sum(1 for g in games if g["result"] == "a")
+    draws = sum(1 for g in games if g["result"] == "draw")
+    losses = n - wins - draws
+
+    scores = [1.0 if g["result"] == "a" else 0.5 if g["result"] == "draw" else 0.0 for g in games]
+    mean = sum(scores) / n if n else 0.0
+    var = sum((s - mean) ** 2 for s in scores) / (n - 1) if n > 1 else 0.0
+    half = 1.96 * math.sqrt(var / n) if n else 0.0
+
+    def side(key):
+        moves = sum(g[key]["moves"] for g in games)
+        secs = sum(g[key]["time"] for g in games)
+        nodes = sum(g[key]["nodes"] for g in games)
+        return {
+            "avg_move_ms": 1000 * secs / moves if moves else 0.0,
+            "nodes_per_sec": nodes / secs if secs else 0.0,
+        }
+
+    return {
+        "summary": True,
+        "games": n,
+        "wins": wins, "draws": draws, "losses": losses,
+        "win_ci": wilson_interval(wins, n),
+        "draw_ci": wilson_interval(draws, n),
+        "loss_ci": wilson_interval(losses, n),
+        "score": mean,
+        "score_ci": (max(0.0, mean - half), min(1.0, mean + half)),
+        "a": side("a"),
+        "b": side("b"),
+        "elapsed_sec": elapsed,
+        "games_per_sec": n / elapsed if elapsed else 0.0,
+    }
+
+
+def run(config_a, config_b, games, workers=1, seed=0, opening_plies=2, max_plies=200, out=sys.stdout,
+        archive=None, size=9):
+    """Plays games over a process pool, streaming one JSON line per game, then a summary line.
+
+    archive, if given, is a GameRecordWriter that receives every game as it finishes.
+    """
+    tasks = [(config_a, config_b, i % 2 == 0, seed + i, opening_plies, max_plies, size) for i in range(games)]
+    results = []
+    start = time.perf_counter()
+
+    def emit(record):
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+        if archive is not None and "moves" in record:
+            winner = record["winner"]
+            archive.write(from_text(record["moves"], size), size, result=0 if winner is None else winner + 1)
+
+    if workers <= 1:
+        for task in tasks:
+            results.append(_play_game_task(task))
+            emit(results[-1])
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            for record in pool.imap_unordered(_play_game_task, tasks):
+                results.append(record)
+                emit(record)
+
+    summary = summarize(results, time.perf_counter() - start)
+    emit(summary)
+    return summary
+
+
+def _engine_config(args, side):
+    get = lambda name: getattr(args, f"{name}_{side}")
+    return {
+        "search_depth": get("depth"),
+        "wall_bonus_weight": get("weight"),
+        "time_budget": get("time"),
+        "node_budget": get("nodes"),
+        "tt_size_mb": args.tt_mb,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless engine-vs-engine Quoridor matches.")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--opening-plies", type=int, default=2)
+    parser.add_argument("--max-plies", type=int, default=200)
+    parser.add_argument("--size", type=int, default=9, help="board size (odd)")
+    parser.add_argument("--tt-mb", type=int, default=16)
+    parser.add_argument("--output", help="JSON lines file (default: stdout)")
+    parser.add_argument("--archive", help="append the games to this binary game archive")
+    for side in ("a", "b"):
+        parser.add_argument(f"--depth-{side}", type=int, default=1)
+        parser.add_argument(f"--weight-{side}", type=float, default=1.5, help="wall bonus, a multiple of 1/1024")
+        parser.add_argument(f"--time-{side}", type=float, default=None, help="seconds per move")
+        parser.add_argument(f"--nodes-{side}", type=int, default=None, help="node budget per move")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    archive = GameRecordWriter(args.archive, append=True) if args.archive else None
+    try:
+        run(_engine_config(args, "a"), _engine_config(args, "b"), args.games, args.workers,
+            args.seed, args.opening_plies, args.max_plies, out, archive, args.size)
+    finally:
+        if archive is not None:
+            archive.close()
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Rough CPython footprint of one stored entry (tuple + boxed fields + list slot).
+ENTRY_BYTES = 120
+
+
+class TranspositionTable:
+    """Bounded Zobrist-keyed cache of search results.
+
+    Each bucket has two slots: slot 0 keeps the deepest result seen for the bucket,
+    slot 1 is always overwritten. Entries are (key, depth, flag, value, best_move).
+    """
+    def __init__(self, size_mb=16):
+        self.buckets = max(1, (size_mb * 1024 * 1024) // (2 * ENTRY_BYTES))
+        self.slots = [None] * (2 * self.buckets)
+        self.hits = 0
+        self.stores = 0
+
+    def clear(self):
+        self.slots = [None] * (2 * self.buckets)
+        self.hits = 0
+        self.stores = 0
+
+    def probe(self, key):
+        i = 2 * (key % self.buckets)
+        e = self.slots[i]
+        if e is not None and e[0] == key:
+            self.hits += 1
+            return e
+        e = self.slots[i + 1]
+        if e is not None and e[0] == key:
+            self.hits += 1
+            return e
+        return None
+
+    def store(self, key, depth, flag, value, best_move):
+        i = 2 * (key % self.buckets)
+        entry = (key, depth, flag, value, best_move)
+        deep = self.slots[i]
+        if deep is None or deep[0] == key or depth >= deep[1]:
+            if deep is not None and deep[0] != key:
+                self.slots[i + 1] = deep
+            self.slots[i] = entry
+        else:
+            self.slots[i + 1] = entry
+        self.stores += 1
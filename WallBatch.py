@@ -0,0 +1,86 @@
+import numpy as np
+from BitBoard import UP, DOWN, LEFT, RIGHT, iter_bits
+from Config import HORIZONTAL, VERTICAL
+
+INF = 1 << 14
+
+_EDGE_INDEX = {}
+
+
+def _edge_index(size):
+    """Per (orientation, slot): the (direction, row, col) triples of the edges that wall closes."""
+    idx = _EDGE_INDEX.get(size)
+    if idx is None:
+        from BitBoard import tables
+        t = tables(size)
+        idx = {}
+        for orient, edges in ((HORIZONTAL, t.h_edges), (VERTICAL, t.v_edges)):
+            for slot, pairs in enumerate(edges):
+                triples = [(d, cell // size, cell % size) for d, mask in pairs for cell in iter_bits(mask)]
+                idx[orient, slot] = np.array(triples, dtype=np.intp)
+        _EDGE_INDEX[size] = idx
+    return idx
+
+
+def open_planes(state):
+    """The four passable-edge masks of state as a (4, size, size) bool array."""
+    n = state.size
+    planes = np.array([[(o >> b) & 1 for b in range(n * n)] for o in state.open], dtype=bool)
+    return planes.reshape(4, n, n)
+
+
+def goal_distances(open_, size):
+    """Wall-only distance to each player's goal row for a stack of boards.
+
+    open_ is (K, 4, size, size); returns (K, 2, size, size) with INF where the goal is cut off.
+    Every cell is relaxed from its four neighbours at once until nothing changes.
+    """
+    k = open_.shape[0]
+    dist = np.full((k, 2, size, size), INF, dtype=np.int32)
+    dist[:, 0, 0, :] = 0
+    dist[:, 1, size - 1, :] = 0
+
+    up = open_[:, None, UP, 1:, :]
+    down = open_[:, None, DOWN, :-1, :]
+    left = open_[:, None, LEFT, :, 1:]
+    right = open_[:, None, RIGHT, :, :-1]
+    while True:
+        step = dist + 1
+        new = dist.copy()
+        np.minimum(new[:, :, 1:, :], np.where(up, step[:, :, :-1, :], INF), out=new[:, :, 1:, :])
+        np.minimum(new[:, :, :-1, :], np.where(down, step[:, :, 1:, :], INF), out=new[:, :, :-1, :])
+        np.minimum(new[:, :, :, 1:], np.where(left, step[:, :, :, :-1], INF), out=new[:, :, :, 1:])
+        np.minimum(new[:, :, :, :-1], np.where(right, step[:, :, :, 1:], INF), out=new[:, :, :, :-1])
+        if np.array_equal(new, dist):
+            return dist
+        dist = new
+
+
+def evaluate_walls(state):
+    """Scores every wall that fits in state in one batch.
+
+    Returns (candidates, legal, delta_p1, delta_p2): candidates is a list of (slot, orientation),
+    legal a bool array saying the wall leaves both goals reachable, and the deltas are how much
+    each player's shortest path grows (meaningless where legal is False).
+    """
+    n = state.size
+    candidates = [(slot, orient) for orient in (HORIZONTAL, VERTICAL)
+                  for slot in iter_bits(state.free_wall_slots(orient))]
+    if not candidates:
+        empty = np.zeros(0, dtype=np.int32)
+        return candidates, empty.astype(bool), empty, empty
+
+    index = _edge_index(n)
+    k = len(candidates)
+    open_ = np.broadcast_to(open_planes(state), (k, 4, n, n)).copy()
+    rows = np.repeat(np.arange(k), 4)
+    edges = np.concatenate([index[orient, slot] for slot, orient in candidates])
+    open_[rows, edges[:, 0], edges[:, 1], edges[:, 2]] = False
+
+    dist = goal_distances(open_, n)
+    r0, c0 = divmod(state.pawns[0], n)
+    r1, c1 = divmod(state.pawns[1], n)
+    d0 = dist[:, 0, r0, c0]
+    d1 = dist[:, 1, r1, c1]
+    legal = (d0 < INF) & (d1 < INF)
+    return candidates, legal, d0 - state.goal_distance(0), d1 - state.goal_distance(1)
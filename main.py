@@ -1,41 +1,50 @@
 import pygame
 import sys
-import threading
 import math
 import os
 from Board import Board
-from Config import THEME, HORIZONTAL, VERTICAL
+from Config import THEME, ARCHIVE_PATH
 
 # Center the window
 os.environ['SDL_VIDEO_CENTERED'] = '1'
 
 class GameGUI:
-    def __init__(self, vs_ai=True):
+    def __init__(self, vs_ai=True, size=9):
         pygame.init()
         self.screen_w, self.screen_h = 800, 600
         self.screen = pygame.display.set_mode((self.screen_w, self.screen_h))
         pygame.display.set_caption("QUORIDOR")
         
-        self.board_logic = Board(vs_ai_mode=vs_ai)
+        self.board_logic = Board(size, vs_ai_mode=vs_ai)
         self.clock = pygame.time.Clock()
         
         self.font_ui = pygame.font.SysFont("consolas", 18)
         self.font_title = pygame.font.SysFont("consolas", 30, bold=True)
         self.font_win = pygame.font.SysFont("consolas", 50, bold=True)
 
-        self.margin = 15
+        # Wall gaps shrink on bigger boards so the cells stay usable.
+        self.margin = max(6, 15 * 9 // size)
         self.game_size = min(self.screen_h, self.screen_w) * 0.70 
         
         self.start_x = (self.screen_w - self.game_size) // 2
         self.start_y = (self.screen_h - self.game_size) // 2 + 20
         
-        self.cell_size = int((self.game_size - (10 * self.margin)) / 9)
+        self.cell_size = int((self.game_size - ((size + 1) * self.margin)) / size)
         
         self.hover_node = None
         self.wall_anchor = None
         
         self.running = True
         self.ai_thinking = False
+        self.ai_position = None
+        # Hard limit for one AI move; the engine is asked to stop and answer once it passes.
+        self.ai_timeout = 10.0
+        # Let the AI keep thinking while the human does.
+        self.ponder = True
+        # Search statistics overlay, toggled with Tab.
+        self.show_stats = False
+        self._stats_src = None
+        self._stats_lines = []
         self.winner = None
         self.err_msg = ""
         self.err_time = 0
@@ -48,28 +57,48 @@ class GameGUI:
             btn_w, btn_h
         )
 
+        self._tints = {}
+        self._text_cache = {}
+        self._board_key = None
+        self._last_frame = None
+        self._dirty = []
+        self._build_layout()
+        self._render_static()
+        if self.board_logic.vs_ai:
+            self.board_logic.p2.worker()    # start the engine process now so the first reply is quick
+
+    def _build_layout(self):
+        """Pixel offset and size of every display-grid row/column, and the rect of every square.
+
+        Rows and columns share one table: even indices are cells (cell_size wide),
+        odd ones are wall gaps (margin wide), repeating every pitch pixels.
+        """
+        n = self.board_logic.total_dim
+        self.pitch = self.cell_size + self.margin
+        self.origin_x = int(self.start_x) + self.margin
+        self.origin_y = int(self.start_y) + self.margin
+        self.axis_off = [(i // 2) * self.pitch + (self.cell_size if i % 2 else 0) for i in range(n)]
+        self.axis_len = [self.cell_size if i % 2 == 0 else self.margin for i in range(n)]
+        self.grid_rects = [[pygame.Rect(self.origin_x + self.axis_off[c], self.origin_y + self.axis_off[r],
+                                        self.axis_len[c], self.axis_len[r]) for c in range(n)]
+                           for r in range(n)]
+
     def to_screen_coords(self, grid_x, grid_y):
-        pixel_x = self.start_x + self.margin
-        for i in range(grid_x):
-            pixel_x += self.cell_size if i % 2 == 0 else self.margin
-            
-        pixel_y = self.start_y + self.margin
-        for i in range(grid_y):
-            pixel_y += self.cell_size if i % 2 == 0 else self.margin
-            
-        w = self.cell_size if grid_x % 2 == 0 else self.margin
-        h = self.cell_size if grid_y % 2 == 0 else self.margin
-        return pixel_x, pixel_y, w, h
+        return tuple(self.grid_rects[grid_y][grid_x])
+
+    def _axis_index(self, d):
+        if d < 0:
+            return None
+        q, rem = divmod(d, self.pitch)
+        i = 2 * q if rem < self.cell_size else 2 * q + 1
+        return i if i < self.board_logic.total_dim else None
 
     def get_grid_from_mouse(self, mx, my):
-        total_dim = self.board_logic.total_dim
-        for r in range(total_dim):
-            for c in range(total_dim):
-                px, py, w, h = self.to_screen_coords(c, r)
-                rect = pygame.Rect(px, py, w, h)
-                if rect.collidepoint(mx, my):
-                    return c, r
-        return None
+        c = self._axis_index(mx - self.origin_x)
+        r = self._axis_index(my - self.origin_y)
+        if c is None or r is None:
+            return None
+        return c, r
 
     def draw_glow_circle(self, surf, color, center, radius):
         for i in range(3):
@@ -78,84 +107,181 @@ class GameGUI:
         pygame.draw.circle(surf, pygame.Color(color), center, radius)
         pygame.draw.circle(surf, (255, 255, 255), center, radius - 4)
 
+    def _render_static(self):
+        """Background, board plate and empty cells: everything that never changes."""
+        layer = pygame.Surface((self.screen_w, self.screen_h))
+        layer.fill(pygame.Color(THEME["background"]))
+        bg_rect = pygame.Rect(self.start_x, self.start_y, self.game_size, self.game_size)
+        pygame.draw.rect(layer, pygame.Color(THEME["board_bg"]), bg_rect, border_radius=10)
+        pygame.draw.rect(layer, pygame.Color(THEME["grid_lines"]), bg_rect, 2, border_radius=10)
+        n = self.board_logic.total_dim
+        for r in range(0, n, 2):
+            for c in range(0, n, 2):
+                pygame.draw.rect(layer, (30, 30, 30), self.grid_rects[r][c], border_radius=4)
+        self.static_layer = layer
+
+    def _render_board(self):
+        """Static layer plus walls and pawns; rebuilt only when the position changes."""
+        layer = self.static_layer.copy()
+        n = self.board_logic.total_dim
+        for r in range(n):
+            for c in range(n):
+                val = self.board_logic.grid_value(r, c)
+                if val == 0:
+                    continue
+                rect = self.grid_rects[r][c]
+                if r % 2 == 0 and c % 2 == 0:
+                    self._draw_pawn(layer, val, rect)
+                else:
+                    pygame.draw.rect(layer, pygame.Color(THEME["wall_color"]), rect)
+        self.board_layer = layer
+        self._board_key = self.board_logic.state.hash
+
+    def _draw_pawn(self, surf, val, rect):
+        color = THEME["p1_color"] if val == 1 else THEME["p2_color"]
+        self.draw_glow_circle(surf, color, rect.center, rect.w // 3)
+
+    def _tint(self, w, h):
+        surf = self._tints.get((w, h))
+        if surf is None:
+            surf = self._tints[w, h] = pygame.Surface((w, h), pygame.SRCALPHA)
+            surf.fill((57, 255, 20, 100))
+        return surf
+
+    def _text(self, font, text, color):
+        key = (font, text, color)
+        surf = self._text_cache.get(key)
+        if surf is None:
+            surf = self._text_cache[key] = font.render(text, True, pygame.Color(color))
+        return surf
+
+    def _overlays(self):
+        """Hover highlight and wall preview for this frame, as ("hover" | "preview", grid x, grid y)."""
+        items = []
+        if self.hover_node:
+            hx, hy = self.hover_node
+            if hx % 2 == 0 and hy % 2 == 0 and self.board_logic.active_player.id == 1 and not self.ai_thinking:
+                items.append(("hover", hx, hy))
+            if self.wall_anchor:
+                ax, ay = self.wall_anchor
+                if abs(ax - hx) == 2 or abs(ay - hy) == 2:
+                    for gx, gy in ((ax, ay), (hx, hy), ((ax + hx) // 2, (ay + hy) // 2)):
+                        items.append(("preview", gx, gy))
+        return items
+
     def draw(self):
         if self.winner:
-            self.draw_game_over()
-            pygame.display.flip()
+            hover = self.exit_btn_rect.collidepoint(pygame.mouse.get_pos())
+            if self._last_frame != (self.winner, hover):
+                self._last_frame = (self.winner, hover)
+                self.draw_game_over()
+                pygame.display.flip()
             return
 
-        self.screen.fill(pygame.Color(THEME["background"]))
-        
-        bg_rect = pygame.Rect(self.start_x, self.start_y, self.game_size, self.game_size)
-        pygame.draw.rect(self.screen, pygame.Color(THEME["board_bg"]), bg_rect, border_radius=10)
-        pygame.draw.rect(self.screen, pygame.Color(THEME["grid_lines"]), bg_rect, 2, border_radius=10)
-
-        total_dim = self.board_logic.total_dim
-        for r in range(total_dim):
-            for c in range(total_dim):
-                px, py, w, h = self.to_screen_coords(c, r)
-                val = self.board_logic.grid[r, c]
-                is_cell = (r % 2 == 0 and c % 2 == 0)
-                is_wall_slot = not is_cell
-                
-                if is_cell:
-                    pygame.draw.rect(self.screen, (30, 30, 30), (px, py, w, h), border_radius=4)
-                    if self.hover_node == (c, r) and self.board_logic.active_player.id == 1 and not self.ai_thinking:
-                        pygame.draw.rect(self.screen, (50, 50, 50), (px, py, w, h), border_radius=4)
-                    if val == 1:
-                        self.draw_glow_circle(self.screen, THEME["p1_color"], (px+w//2, py+h//2), w//3)
-                    elif val == 2:
-                        self.draw_glow_circle(self.screen, THEME["p2_color"], (px+w//2, py+h//2), w//3)
-                elif is_wall_slot and val != 0:
-                    pygame.draw.rect(self.screen, pygame.Color(THEME["wall_color"]), (px, py, w, h))
-
-        if self.wall_anchor:
-            ax, ay = self.wall_anchor
-            if self.hover_node:
-                hx, hy = self.hover_node
-                if abs(ax - hx) == 2 or abs(ay - hy) == 2:
-                    px1, py1, w1, h1 = self.to_screen_coords(ax, ay)
-                    px2, py2, w2, h2 = self.to_screen_coords(hx, hy)
-                    cx, cy = (ax+hx)//2, (ay+hy)//2
-                    pc, pyc, wc, hc = self.to_screen_coords(cx, cy)
-                    s = pygame.Surface((self.screen_w, self.screen_h), pygame.SRCALPHA)
-                    c_rgba = (57, 255, 20, 100)
-                    pygame.draw.rect(s, c_rgba, (px1, py1, w1, h1))
-                    pygame.draw.rect(s, c_rgba, (px2, py2, w2, h2))
-                    pygame.draw.rect(s, c_rgba, (pc, pyc, wc, hc))
-                    self.screen.blit(s, (0,0))
-
-        self.draw_ui()
-        pygame.display.flip()
+        overlays = self._overlays()
+        ui = self.draw_ui()
+        frame = (self.board_logic.state.hash, tuple(overlays), tuple((id(s), pos) for s, pos in ui))
+        if frame == self._last_frame:
+            return
+        self._last_frame = frame
+
+        if self._board_key != self.board_logic.state.hash:
+            self._render_board()
+            self.screen.blit(self.board_layer, (0, 0))
+            dirty = [self.screen.get_rect()]
+        else:
+            # Only restore what the previous frame painted over the board layer.
+            for rect in self._dirty:
+                self.screen.blit(self.board_layer, rect, rect)
+            dirty = self._dirty
+
+        painted = []
+        for kind, gx, gy in overlays:
+            rect = self.grid_rects[gy][gx]
+            if kind == "hover":
+                pygame.draw.rect(self.screen, (50, 50, 50), rect, border_radius=4)
+                val = self.board_logic.grid_value(gy, gx)
+                if val:
+                    self._draw_pawn(self.screen, val, rect)
+            else:
+                self.screen.blit(self._tint(rect.w, rect.h), rect)
+            painted.append(rect)
+        for surf, pos in ui:
+            painted.append(self.screen.blit(surf, pos))
+
+        self._dirty = painted
+        pygame.display.update(dirty + painted)
 
     def draw_ui(self):
+        """Text for this frame as (surface, position) pairs; surfaces are cached per string."""
         p1 = self.board_logic.p1
         p2 = self.board_logic.p2
-        
+        items = []
+
         # Stats in top corners
-        lbl_p1 = self.font_ui.render(f"P1 WALLS: {p1.walls_left}", True, pygame.Color(THEME["p1_color"]))
-        self.screen.blit(lbl_p1, (self.start_x, 20))
-        
-        lbl_p2 = self.font_ui.render(f"P2 WALLS: {p2.walls_left}", True, pygame.Color(THEME["p2_color"]))
-        self.screen.blit(lbl_p2, (self.screen_w - self.start_x - lbl_p2.get_width(), 20))
+        lbl_p1 = self._text(self.font_ui, f"P1 WALLS: {p1.walls_left}", THEME["p1_color"])
+        items.append((lbl_p1, (self.start_x, 20)))
+
+        lbl_p2 = self._text(self.font_ui, f"P2 WALLS: {p2.walls_left}", THEME["p2_color"])
+        items.append((lbl_p2, (self.screen_w - self.start_x - lbl_p2.get_width(), 20)))
 
         if self.ai_thinking:
             msg, col = ">> AI THINKING...", "#FFFFFF"
         else:
             turn = "P1" if self.board_logic.active_player.id == 1 else "P2"
             msg, col = f">> TURN: {turn}", THEME["p1_color"] if turn == "P1" else THEME["p2_color"]
-            
-        status = self.font_title.render(msg, True, pygame.Color(col))
-        
+
+        status = self._text(self.font_title, msg, col)
+
         # VISUAL FIX: Moved 'TURN' text down to Y=60 so it doesn't overlap walls
-        self.screen.blit(status, (self.screen_w//2 - status.get_width()//2, 60))
-        
-        hint = self.font_ui.render("[Ctrl+Z] Undo  [Ctrl+Y] Redo", True, (100, 100, 100))
-        self.screen.blit(hint, (self.screen_w//2 - hint.get_width()//2, self.screen_h - 40))
+        items.append((status, (self.screen_w//2 - status.get_width()//2, 60)))
+
+        if self.show_stats:
+            items += self._stats_overlay(status.get_height())
+
+        hint = self._text(self.font_ui, "[Ctrl+Z] Undo  [Ctrl+Y] Redo  [Tab] AI Stats", "#646464")
+        items.append((hint, (self.screen_w//2 - hint.get_width()//2, self.screen_h - 40)))
 
         if pygame.time.get_ticks() < self.err_time:
-            err = self.font_ui.render(f"[!] {self.err_msg}", True, (255, 50, 50))
-            self.screen.blit(err, (self.screen_w//2 - err.get_width()//2, self.screen_h - 80))
+            err = self._text(self.font_ui, f"[!] {self.err_msg}", "#FF3232")
+            items.append((err, (self.screen_w//2 - err.get_width()//2, self.screen_h - 80)))
+        return items
+
+    def _stats_overlay(self, top):
+        """The AI's latest search statistics as text lines in the left margin, below the status line.
+
+        Lines are re-rendered only when the worker reports new figures.
+        """
+        worker = getattr(self.board_logic.p2, "_worker", None)
+        stats = worker.progress if worker is not None else None
+        if stats is not self._stats_src:
+            self._stats_src = stats
+            lines = ["AI SEARCH"]
+            if stats:
+                total = stats["movegen_sec"] + stats["legality_sec"] + stats["eval_sec"]
+                share = lambda t: f"{100 * t / stats['seconds']:.0f}%" if stats["seconds"] else "-"
+                lines += [
+                    f"source  {stats['source']}",
+                    f"depth   {stats['depth']}",
+                    f"nodes   {stats['nodes']}",
+                    f"n/sec   {stats['nodes_per_sec']}",
+                    f"bfs/n   {stats['floods_per_node']:.2f}",
+                    f"cut     {100 * stats['cutoff_rate']:.0f}%",
+                    f"cut@1st {100 * stats['first_move_cutoffs']:.0f}%",
+                    f"gen     {share(stats['movegen_sec'])}",
+                    f"legal   {share(stats['legality_sec'])}",
+                    f"eval    {share(stats['eval_sec'])}",
+                    f"other   {share(max(0.0, stats['seconds'] - total))}",
+                ]
+            else:
+                lines.append("no data yet")
+            self._stats_lines = [self.font_ui.render(line, True, pygame.Color("#8C8C8C")) for line in lines]
+        y = 60 + top + 10
+        items = []
+        for surf in self._stats_lines:
+            items.append((surf, (15, y)))
+            y += surf.get_height() + 2
+        return items
 
     def draw_game_over(self):
         if self.blur_bg is None:
@@ -198,17 +324,19 @@ class GameGUI:
             
             if not self.winner:
                 if event.type == pygame.KEYDOWN:
-                    if event.mod & pygame.KMOD_CTRL:
-                        if event.key == pygame.K_z and not self.ai_thinking:
-                            if self.board_logic.undo():
-                                self.wall_anchor = None
-                                if self.board_logic.vs_ai: self.board_logic.undo()
-                        if event.key == pygame.K_y and not self.ai_thinking:
-                            if self.board_logic.redo():
-                                if self.board_logic.vs_ai: self.board_logic.redo()
+                    if event.key == pygame.K_TAB:
+                        self.show_stats = not self.show_stats
+                    if event.mod & pygame.KMOD_CTRL and event.key in (pygame.K_z, pygame.K_y):
+                        if event.key == pygame.K_z:
+                            self.take_back()
+                        else:
+                            self.step_forward()
+                        continue
+
+                if self.board_logic.vs_ai and self.board_logic.active_player is self.board_logic.p2:
+                    continue
 
                 if event.type == pygame.KEYDOWN and not self.ai_thinking:
-                    if self.board_logic.vs_ai and self.board_logic.active_player.id == 2: continue
                     
                     keys = {
                         pygame.K_UP: "top", pygame.K_DOWN: "down",
@@ -218,13 +346,9 @@ class GameGUI:
                     }
                     
                     if event.key in keys:
-                        self.board_logic.save_snapshot() # Save state
                         moved = self.board_logic.active_player.handle_move_request(keys[event.key])
                         if moved:
-                            self.board_logic.clear_redo()
                             self.end_turn()
-                        else:
-                            self.board_logic.history.pop() # Invalid move, revert history
 
                 if event.type == pygame.MOUSEBUTTONDOWN and not self.ai_thinking:
                     mx, my = pygame.mouse.get_pos()
@@ -243,26 +367,12 @@ class GameGUI:
                                     mid_x, mid_y = (ax+cx)//2, (ay+cy)//2
                                     coords = [(ay, ax), (mid_y, mid_x), (cy, cx)]
                                     
-                                    self.board_logic.save_snapshot() # Save state
                                     p = self.board_logic.active_player
-                                    if all(self.board_logic.grid[r, c] == 0 for r, c in coords):
-                                        for r, c in coords: self.board_logic.grid[r, c] = 1
-                                        
-                                        if p.has_path_to_goal(self.board_logic.grid) and \
-                                           self.board_logic.p2.has_path_to_goal(self.board_logic.grid) and \
-                                           self.board_logic.p1.has_path_to_goal(self.board_logic.grid):
-                                            
-                                            self.board_logic.grid[mid_y, mid_x] = HORIZONTAL if ay == cy else VERTICAL
-                                            p.walls_left -= 1
-                                            self.board_logic.clear_redo()
-                                            self.end_turn()
-                                        else:
-                                            for r, c in coords: self.board_logic.grid[r, c] = 0
-                                            self.board_logic.history.pop()
-                                            self.show_err("Blocks Path!")
+                                    err = self.board_logic.place_wall(p, coords)
+                                    if err is None:
+                                        self.end_turn()
                                     else:
-                                        self.board_logic.history.pop()
-                                        self.show_err("Occupied!")
+                                        self.show_err(err)
                                 else:
                                     self.show_err("Invalid Shape")
                                 self.wall_anchor = None
@@ -270,26 +380,69 @@ class GameGUI:
                             self.wall_anchor = None
 
     def end_turn(self):
-        p1_win = (self.board_logic.p1.pos[0] == 0)
-        p2_win = (self.board_logic.p2.pos[0] == 16)
+        p1_win = self.board_logic.state.at_goal(0)
+        p2_win = self.board_logic.state.at_goal(1)
         
         if p1_win: self.winner = "PLAYER 1"
         elif p2_win: self.winner = "PLAYER 2"
         
         if self.board_logic.active_player == self.board_logic.p1 and not self.winner:
             self.board_logic.active_player = self.board_logic.p2
-            if self.board_logic.vs_ai:
-                self.ai_thinking = True
-                threading.Thread(target=self.run_ai).start()
+            self.start_ai()
         elif not self.winner:
             self.board_logic.active_player = self.board_logic.p1
 
-    def run_ai(self):
-        self.board_logic.save_snapshot()
-        self.board_logic.p2.ai_move()
-        self.board_logic.clear_redo()
+    def start_ai(self):
+        """Asks the worker for a move whenever it is the AI's turn and it isn't already thinking."""
+        board = self.board_logic
+        if not board.vs_ai or board.active_player is not board.p2 or self.ai_thinking or self.winner:
+            return
+        self.ai_thinking = True
+        self.ai_position = board.state.hash
+        board.p2.worker().submit(board.get_snapshot(), board.p2.idx, timeout=self.ai_timeout)
+
+    def take_back(self):
+        """Ctrl+Z: back to the human's previous turn. While the AI thinks, its pending reply is dropped."""
+        board = self.board_logic
+        self.wall_anchor = None
+        if self.ai_thinking:
+            self.cancel_ai()
+            board.undo()
+        elif board.undo() and board.vs_ai and board.active_player is board.p2:
+            board.undo()
+        self.start_ai()
+
+    def step_forward(self):
+        """Ctrl+Y: replays the human's move and the AI's answer; if the answer isn't there, the AI thinks again."""
+        board = self.board_logic
+        if self.ai_thinking:
+            return
+        if board.redo() and board.vs_ai and board.active_player is board.p2:
+            board.redo()
+        self.start_ai()
+
+    def poll_ai(self):
+        """Plays the worker's move once it arrives, unless the position changed meanwhile."""
+        if not self.ai_thinking:
+            return
+        result = self.board_logic.p2.worker().poll()
+        if result is None:
+            return
+        _, move, _ = result
         self.ai_thinking = False
+        if self.board_logic.state.hash != self.ai_position or self.board_logic.active_player is not self.board_logic.p2:
+            return
+        if move:
+            self.board_logic.p2._apply_move_real(move)
         self.end_turn()
+        if self.ponder and not self.winner:
+            p2 = self.board_logic.p2
+            p2.worker().ponder(self.board_logic.get_snapshot(), p2.idx)
+
+    def cancel_ai(self):
+        if self.ai_thinking:
+            self.board_logic.p2.worker().cancel()
+            self.ai_thinking = False
 
     def show_err(self, msg):
         self.err_msg = msg
@@ -300,8 +453,13 @@ class GameGUI:
             mx, my = pygame.mouse.get_pos()
             self.hover_node = self.get_grid_from_mouse(mx, my)
             self.handle_input()
+            self.poll_ai()
             self.draw()
             self.clock.tick(60)
+        self.cancel_ai()
+        self.board_logic.archive(ARCHIVE_PATH)
+        if self.board_logic.vs_ai:
+            self.board_logic.p2.close()
 
 class Menu:
     def run(self):
@@ -337,6 +495,7 @@ class Menu:
             pygame.display.flip()
 
 if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 9
     mode = Menu().run()
-    game = GameGUI(vs_ai=mode)
+    game = GameGUI(vs_ai=mode, size=size)
     game.main_loop()
\ No newline at end of file
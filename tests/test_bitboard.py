@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from BitBoard import BitBoard
+from Config import HORIZONTAL, TYPE_PAWN, VERTICAL
+from Rules import legal_moves
+
+PLIES = 40
+GAMES = 6
+
+
+def brute_force_walls(state):
+    """Every fitting wall that keeps both paths, checked one flood fill at a time."""
+    walls = []
+    for orient in (HORIZONTAL, VERTICAL):
+        for slot in range((state.size - 1) ** 2):
+            if state.wall_fits(slot, orient) and state.wall_keeps_paths(slot, orient):
+                walls.append((slot, orient))
+    return sorted(walls)
+
+
+def check(state):
+    assert state.hash == state._full_hash()
+    for idx in (0, 1):
+        assert state.fields[idx] == state._build_field(idx)
+    assert sorted(state.legal_walls()) == brute_force_walls(state)
+
+
+def random_game(size, rng):
+    """Plays up to PLIES random moves, mostly walls, yielding the state after each one."""
+    state = BitBoard(size)
+    idx = 0
+    stack = []
+    for _ in range(PLIES):
+        moves = legal_moves(state, idx)
+        walls = [m for m in moves if m[0] != TYPE_PAWN]
+        pawns = [m for m in moves if m[0] == TYPE_PAWN]
+        move = rng.choice(walls if walls and rng.random() < 0.6 else pawns)
+        stack.append((idx, move, state.apply(idx, move)))
+        yield state, stack
+        if state.at_goal(idx):
+            break
+        idx = 1 - idx
+
+
+@pytest.mark.parametrize("size", [5, 7, 9, 11])
+def test_incremental_state_matches_recomputation(size):
+    rng = random.Random(size)
+    fresh = BitBoard(size)
+    for _ in range(GAMES):
+        state = stack = None
+        for state, stack in random_game(size, rng):
+            check(state)
+        while stack:
+            idx, move, token = stack.pop()
+            state.undo(idx, move, token)
+            check(state)
+        assert state.pack() == fresh.pack()
+        assert state.hash == fresh.hash
+        assert state.fields == fresh.fields
+
+
+@pytest.mark.parametrize("size", [5, 9])
+def test_remove_wall_without_change_log_lowers_fields(size):
+    """Walls taken off in a different order than placed go through _lower_field."""
+    rng = random.Random(100 + size)
+    for _ in range(GAMES):
+        state = BitBoard(size, walls=0)
+        placed = []
+        for _ in range(8):
+            walls = state.legal_walls()
+            if not walls:
+                break
+            slot, orient = rng.choice(walls)
+            state.place_wall(slot, orient)
+            placed.append((slot, orient))
+            check(state)
+        rng.shuffle(placed)
+        for slot, orient in placed:
+            state.remove_wall(slot, orient)
+            check(state)
+        assert state.fields == BitBoard(size, walls=0).fields
+
+
+def test_restricted_legal_walls_respect_masks():
+    rng = random.Random(7)
+    for state, _ in random_game(9, rng):
+        h_mask = rng.getrandbits(64) & state.t.all_slots
+        v_mask = rng.getrandbits(64) & state.t.all_slots
+        expected = [(s, o) for s, o in brute_force_walls(state)
+                    if ((h_mask if o == HORIZONTAL else v_mask) >> s) & 1]
+        assert sorted(state.legal_walls((h_mask, v_mask))) == expected
@@ -0,0 +1,32 @@
+from Board import Board
+from GameRecord import from_text
+
+
+def test_place_wall_needs_a_wall_in_hand():
+    board = Board()
+    board.p1.walls_left = 0
+    before = board.state.hash
+    assert board.place_wall(board.p1, [(1, 0), (1, 1), (1, 2)]) == "No walls left!"
+    assert board.p1.walls_left == 0
+    assert board.state.hash == before == board.state._full_hash()
+
+
+def test_place_wall_reports_bad_walls():
+    board = Board()
+    assert board.place_wall(board.p1, [(1, 0), (1, 1), (1, 2)]) is None
+    assert board.p1.walls_left == 9
+    assert board.place_wall(board.p2, [(1, 0), (1, 1), (1, 2)]) == "Occupied!"
+    assert board.place_wall(board.p2, [(1, 0), (2, 1), (3, 2)]) == "Invalid Shape"
+
+
+def test_redo_into_variations():
+    board = Board()
+    for move in from_text("e2 d1", board.pawn_dim):
+        board.play(0, move)
+        board.undo()
+    assert not board.redo(2)
+    assert not board.redo(-1)
+    assert board.export_text() == ""
+    assert board.redo(0)
+    assert board.export_text() == "e2"
+    assert not board.redo(0)
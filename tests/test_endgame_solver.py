@@ -0,0 +1,79 @@
+import itertools
+from functools import lru_cache
+
+import pytest
+
+from BitBoard import BitBoard
+from Config import HORIZONTAL, VERTICAL
+from EndgameSolver import EndgameSolver, LOSS, UNKNOWN, WIN
+from Rules import pawn_moves
+
+SIZE = 5
+
+
+def race(walls, pawns):
+    state = BitBoard(SIZE, walls=0)
+    for slot, orient in walls:
+        state.place_wall(slot, orient)
+    state.move_pawn(0, pawns[0])
+    state.move_pawn(1, pawns[1])
+    return state
+
+
+def brute_force(state):
+    """outcome(idx, plies): +1 if idx to move can force a win within plies, -1 if it must lose, else 0."""
+    @lru_cache(maxsize=None)
+    def outcome(p0, p1, idx, plies):
+        state.move_pawn(0, p0)
+        state.move_pawn(1, p1)
+        if state.at_goal(1 - idx):
+            return -1
+        if plies == 0:
+            return 0
+        best = -1
+        for move in pawn_moves(state, idx):
+            child = (move[1], p1) if idx == 0 else (p0, move[1])
+            best = max(best, -outcome(*child, 1 - idx, plies - 1))
+            state.move_pawn(0, p0)
+            state.move_pawn(1, p1)
+            if best == 1:
+                break
+        return best
+    return outcome
+
+
+@pytest.mark.parametrize("walls", [
+    [],
+    [(6, HORIZONTAL), (9, VERTICAL)],
+    [(4, HORIZONTAL), (6, HORIZONTAL), (13, VERTICAL)],
+])
+def test_solver_matches_brute_force(walls):
+    solver = EndgameSolver()
+    cells = SIZE * SIZE
+    for a, b in itertools.product(range(cells), range(cells)):
+        if a == b or a // SIZE == 0 or b // SIZE == SIZE - 1:
+            continue
+        state = race(walls, [a, b])
+        outcome = brute_force(state.copy())
+        for idx in (0, 1):
+            result, plies = solver.lookup(state, idx)
+            if result == WIN:
+                assert outcome(a, b, idx, plies) == 1
+                assert outcome(a, b, idx, plies - 1) != 1
+            elif result == LOSS:
+                assert outcome(a, b, idx, plies) == -1
+                assert outcome(a, b, idx, plies - 1) != -1
+            else:
+                assert result == UNKNOWN
+                assert outcome(a, b, idx, 4 * cells) == 0
+
+
+def test_principal_variation_reaches_the_goal():
+    solver = EndgameSolver()
+    state = race([], [2 * SIZE + 2, 1 * SIZE + 1])
+    result, plies = solver.lookup(state, 0)
+    pv = solver.principal_variation(state, 0)
+    assert result == WIN and len(pv) == plies
+    for i, move in enumerate(pv):
+        state.apply(i % 2, move)
+    assert state.at_goal(0)
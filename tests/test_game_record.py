@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from BitBoard import BitBoard
+from Board import Board
+from GameRecord import GameRecordReader, GameRecordWriter, RecordError, encode_game, from_text, to_text
+from Rules import legal_moves
+
+
+def random_game(size, seed, plies=40):
+    rng = random.Random(seed)
+    state = BitBoard(size)
+    moves = []
+    for ply in range(plies):
+        idx = ply % 2
+        move = rng.choice(legal_moves(state, idx))
+        state.apply(idx, move)
+        moves.append(move)
+        if state.at_goal(idx):
+            return moves, idx + 1
+    return moves, 0
+
+
+@pytest.mark.parametrize("size", [9, 11, 13])
+def test_archive_round_trip(tmp_path, size):
+    path = tmp_path / "games.qgr"
+    games = [random_game(size, seed) for seed in range(5)]
+    with GameRecordWriter(path) as writer:
+        for moves, result in games:
+            writer.write(moves, size, result)
+    with GameRecordReader(path) as reader:
+        assert len(reader) == len(games)
+        assert [list(g) for g in reader] == [[moves, size, result] for moves, result in games]
+        assert reader[3] == (games[3][0], size, games[3][1])
+
+
+@pytest.mark.parametrize("size", [9, 11, 13])
+def test_text_round_trip(size):
+    moves, _ = random_game(size, 7)
+    assert from_text(to_text(moves, size), size) == moves
+
+
+def test_append_keeps_earlier_games(tmp_path):
+    path = tmp_path / "games.qgr"
+    first, second = random_game(9, 1), random_game(11, 2)
+    with GameRecordWriter(path) as writer:
+        writer.write(first[0], 9, first[1])
+    with GameRecordWriter(path, append=True) as writer:
+        writer.write(second[0], 11, second[1])
+    with GameRecordReader(path) as reader:
+        assert list(reader) == [(first[0], 9, first[1]), (second[0], 11, second[1])]
+
+
+def test_encoded_game_size():
+    moves, _ = random_game(9, 3, plies=20)
+    assert len(encode_game(moves, 9)) == len(encode_game([], 9)) + len(moves)
+
+
+def test_load_text_plays_a_legal_game():
+    board = Board()
+    board.load_text("e2 d9 e3 c9 e4 b9 e5 a9 e6 b9 e7 a9 e8 b9 e9")
+    assert board.winner == 1
+    assert board.export_text().endswith("e9")
+
+
+@pytest.mark.parametrize("text", [
+    "a9",                                                   # pawn teleport
+    "e2 e8 e3h e3h",                                        # wall on a taken slot
+    "e2 d9 e3 c9 e4 b9 e5 a9 e6 b9 e7 a9 e8 b9 e9 a9",      # move after the game ended
+    " ".join(w + " " + p for w, p in zip(                   # eleventh wall
+        "a3h c3h e3h g3h a5h c5h e5h a7h c7h e7h g5h".split(), ("d9 e9 " * 6).split())),
+])
+def test_load_text_rejects_illegal_plies(text):
+    board = Board()
+    board.load_text("e2")
+    with pytest.raises(RecordError):
+        board.load_text(text)
+    assert board.export_text() == "e2"
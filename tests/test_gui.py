@@ -0,0 +1,82 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import pytest
+
+import AIPlayer
+from main import GameGUI
+
+
+class FakeWorker:
+    """Stands in for the engine process: records jobs and never answers."""
+
+    def __init__(self):
+        self.jobs = []
+        self.cancelled = 0
+
+    def submit(self, snapshot, idx, timeout=None):
+        self.jobs.append(snapshot)
+
+    def ponder(self, snapshot, idx):
+        pass
+
+    def poll(self):
+        return None
+
+    def cancel(self):
+        self.cancelled += 1
+
+    def clear(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def gui(monkeypatch):
+    worker = FakeWorker()
+    monkeypatch.setattr(AIPlayer.AIPlayer, "worker", lambda self: worker)
+    game = GameGUI(vs_ai=True, size=9)
+    game.worker = worker
+    yield game
+    pygame.quit()
+
+
+def press(game, key, mod=0):
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=mod))
+    game.handle_input()
+
+
+def test_undo_redo_while_thinking_resubmits_the_ai(gui):
+    board = gui.board_logic
+    start = board.p1.pos
+
+    press(gui, pygame.K_UP)
+    moved = board.p1.pos
+    assert moved != start
+    assert gui.ai_thinking and len(gui.worker.jobs) == 1
+
+    press(gui, pygame.K_z, pygame.KMOD_CTRL)
+    assert gui.worker.cancelled == 1
+    assert board.active_player is board.p1
+    assert board.p1.pos == start    # taken back, not replayed as a "bottomLeft" move
+    assert not gui.ai_thinking
+
+    press(gui, pygame.K_y, pygame.KMOD_CTRL)
+    assert board.active_player is board.p2
+    assert board.p1.pos == moved
+    assert gui.ai_thinking and len(gui.worker.jobs) == 2
+
+
+def test_human_cannot_move_for_the_ai(gui):
+    board = gui.board_logic
+    press(gui, pygame.K_UP)
+    gui.ai_thinking = False    # e.g. a reply that was dropped
+    p2_pos = board.p2.pos
+    press(gui, pygame.K_DOWN)
+    assert board.p2.pos == p2_pos
+    assert board.active_player is board.p2
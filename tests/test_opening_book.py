@@ -0,0 +1,70 @@
+import io
+import math
+
+import pytest
+
+from BitBoard import BitBoard
+from OpeningBook import SCORE_LIMIT, OpeningBook, build, position_key, score_value, write_book
+from Rules import pawn_moves
+from SearchEngine import SearchEngine
+
+DEPTH = 1
+
+
+@pytest.fixture(scope="module")
+def book(tmp_path_factory):
+    path = tmp_path_factory.mktemp("book") / "book.qbk"
+    write_book(path, build(plies=2, depth=DEPTH, out=io.StringIO()))
+    book = OpeningBook(path)
+    yield book
+    book.close()
+
+
+def engine_value(state, idx, move):
+    engine = SearchEngine(search_depth=DEPTH, time_budget=None)
+    engine.search(state.copy(), idx, [move])
+    return round(engine.best_value * 100)
+
+
+def test_start_position_matches_engine(book):
+    state = BitBoard()
+    entries = book.probe(state, 0)
+    assert len(entries) > 1
+    for move, score in entries:
+        assert score == engine_value(state, 0, move)
+    engine = SearchEngine(search_depth=DEPTH, time_budget=None)
+    best = engine.search(state.copy(), 0)
+    assert entries[0] == (best, round(engine.best_value * 100))
+
+
+def test_reply_positions_match_engine(book):
+    start = BitBoard()
+    for move, _ in book.probe(start, 0):
+        state = start.copy()
+        state.apply(0, move)
+        for reply, score in book.probe(state, 1):
+            assert score == engine_value(state, 1, reply)
+
+
+def test_unknown_position_and_missing_file(book, tmp_path):
+    state = BitBoard()
+    state.place_wall(0, 1)
+    assert book.probe(state, 0) == []
+    assert OpeningBook(tmp_path / "none.qbk").probe(BitBoard(), 0) == []
+
+
+def test_keys_include_side_to_move():
+    state = BitBoard()
+    assert position_key(state, 0) != position_key(state, 1)
+
+
+def test_capped_scores_read_back_as_forced_results(tmp_path):
+    assert score_value(150) == 1.5
+    assert score_value(-SCORE_LIMIT) == -math.inf
+    state = BitBoard()
+    move = pawn_moves(state, 0)[-1]
+    path = tmp_path / "won.qbk"
+    write_book(path, {position_key(state, 0): {move: SCORE_LIMIT}})
+    engine = SearchEngine(search_depth=DEPTH, time_budget=None, book=OpeningBook(path))
+    assert engine.search(state.copy(), 0) == move
+    assert engine.best_value == math.inf
@@ -0,0 +1,139 @@
+import math
+import random
+
+import pytest
+
+from BitBoard import BitBoard, UNREACHABLE
+from Config import TYPE_PAWN
+from Rules import legal_moves
+from SearchEngine import QUIESCENCE_PLIES, SearchEngine
+
+SIZE = 5
+
+
+def positions(count, seed):
+    """Seeded random middlegames on a small board where nobody can win on the spot."""
+    rng = random.Random(seed)
+    found = []
+    while len(found) < count:
+        state = BitBoard(SIZE, walls=3)
+        idx = 0
+        for _ in range(rng.randrange(2, 7)):
+            move = rng.choice(legal_moves(state, idx))
+            state.apply(idx, move)
+            idx = 1 - idx
+        if state.at_goal(0) or state.at_goal(1):
+            continue
+        if any(m[0] == TYPE_PAWN and state.row(m[1]) == state.goal_rows[idx] for m in legal_moves(state, idx)):
+            continue
+        found.append((state, idx))
+    return found
+
+
+def engine(depth, **options):
+    options.setdefault("quiescence", False)
+    return SearchEngine(search_depth=depth, time_budget=None, endgame=False, **options)
+
+
+def alphabeta(eng, state, plies, alpha, beta, is_max, quiesce):
+    """Plain fail-soft alpha-beta in generation order: no null windows, tables or move ordering."""
+    if state.at_goal(eng.opp): return -math.inf
+    if state.at_goal(eng.me): return math.inf
+    mover = eng.me if is_max else eng.opp
+    if plies == 0:
+        return reference_quiesce(eng, state, is_max, QUIESCENCE_PLIES) if quiesce else eng._heuristic(state)
+    best = -math.inf if is_max else math.inf
+    for move in legal_moves(state, mover):
+        token = state.apply(mover, move)
+        value = alphabeta(eng, state, plies - 1, alpha, beta, not is_max, quiesce)
+        state.undo(mover, move, token)
+        if is_max:
+            best = max(best, value)
+            alpha = max(alpha, value)
+        else:
+            best = min(best, value)
+            beta = min(beta, value)
+        if alpha >= beta:
+            break
+    return best
+
+
+def reference_quiesce(eng, state, is_max, plies):
+    """The engine's horizon rule searched exhaustively, without its pruning."""
+    stand = eng._heuristic(state)
+    mover = eng.me if is_max else eng.opp
+    opp = 1 - mover
+    if plies == 0 or not state.walls_left[mover]:
+        return stand
+    values = [stand]
+    before = state.goal_distance(opp)
+    for move in eng._threat_walls(state, opp):
+        token = state.apply(mover, move)
+        after = state.goal_distance(opp)
+        if before < after < UNREACHABLE and state.goal_distance(mover) < UNREACHABLE:
+            values.append(reference_quiesce(eng, state, not is_max, plies - 1))
+        state.undo(mover, move, token)
+    return max(values) if is_max else min(values)
+
+
+@pytest.mark.parametrize("quiesce", [False, True])
+@pytest.mark.parametrize("depth", [1, 2, 3, 4])
+def test_root_value_matches_plain_alphabeta(depth, quiesce):
+    """PVS, aspiration windows, the table and quiescence pruning must not change the root value."""
+    researches = 0
+    for state, idx in positions(6, seed=depth):
+        eng = engine(depth, quiescence=quiesce)
+        before = state.pack()
+        eng.search(state, idx)
+        assert state.pack() == before
+        assert eng.completed_depth == depth + 1
+        assert eng.best_value == alphabeta(eng, state, depth + 1, -math.inf, math.inf, True, quiesce)
+        researches += eng.stats.researches + eng.stats.aspiration_misses
+    assert researches > 0    # the null-window and aspiration re-search paths were taken
+
+
+def test_full_window_root_matches_windowed_search():
+    for state, idx in positions(3, seed=11):
+        eng = engine(2)
+        eng.search(state, idx)
+        plain = engine(2)
+        plain.set_root(idx, state)
+        plain._new_search()
+        _, value, _ = plain._search_root(state, legal_moves(state, idx), 2)
+        assert eng.best_value == value
+
+
+def test_parallel_root_matches_serial():
+    serial = engine(2)
+    parallel = engine(2, workers=2)
+    try:
+        for state, idx in positions(3, seed=5):
+            serial.search(state, idx)
+            parallel.search(state, idx)
+            assert parallel.best_value == serial.best_value
+    finally:
+        parallel.close()
+
+
+def test_wall_weight_must_sit_on_the_score_grid():
+    engine(1, wall_bonus_weight=0.375)
+    with pytest.raises(ValueError):
+        engine(1, wall_bonus_weight=0.1)
+
+
+def test_table_is_shared_between_root_sides():
+    """One engine analysing consecutive positions, as an analysis worker does, agrees with a
+    fresh engine on each: entries stored for one root side must not leak into the other's.
+    """
+    for state, idx in positions(4, seed=21):
+        warm = engine(3)
+        warm.search(state, idx)
+        warm.depth = 1      # shallow enough to take the deep search's entries as exact
+        for reply in legal_moves(state, idx)[:6]:
+            token = state.apply(idx, reply)
+            if not state.at_goal(idx):
+                warm.search(state, 1 - idx)
+                fresh = engine(1)
+                fresh.search(state, 1 - idx)
+                assert warm.best_value == fresh.best_value
+            state.undo(idx, reply, token)